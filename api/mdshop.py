@@ -30,6 +30,12 @@ headers = {
     "Sec-Fetch-Site": "same-site",
     "Connection": "keep-alive"
 }
+
+# One pooled session for the mapping and offer requests, so the second call
+# reuses the TLS connection instead of opening a new one.
+session = requests.Session()
+session.headers.update(headers)
+
 def generate_api_url():
     """
     Generates the API URL with the current UTC date and time.
@@ -58,7 +64,7 @@ def generate_api_url():
 def fetch_mappings():
     mapping_url = "https://mdoffer.mdshop.ba/api/offer/webTree/null/true/true/true/2024-12-29T17:07:03.242/2029-12-29T17:06:33.000/false?eventMappingTypes=1&eventMappingTypes=2&eventMappingTypes=3&eventMappingTypes=4&eventMappingTypes=5"
     try:
-        response = requests.get(mapping_url, headers=headers)
+        response = session.get(mapping_url)
         response.raise_for_status()
         mapping_data = response.json()
         logging.info("Successfully fetched mapping data.")
@@ -146,7 +152,7 @@ def get_api_data(api_url):
     """
     logging.info(f"Sending GET request to API URL: {api_url}")
     try:
-        response = requests.get(api_url, headers=headers)
+        response = session.get(api_url)
         response.raise_for_status()
         data = response.json()
         logging.info("API request successful.")
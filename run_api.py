@@ -3,6 +3,16 @@ package.path = package.path .. [[;C:\Program Files (x86)\NCR\CSM2.0\ftp\PulseAge
 local fc = require("fluentCommon")
 local global = require("global")
 
+local string_upper, string_find, string_sub = string.upper, string.find, string.sub
+local os_time, os_date = os.time, os.date
+local tostring, tinsert, tconcat = tostring, table.insert, table.concat
+local eventFormatter, toTimestamp = global.eventFormatter, global.toTimestamp
+local uuid = fc.uuid
+
+-- Application block shared by every POS (fuel/heartbeat) event; it is only ever
+-- read by eventFormatter, so it must not be mutated.
+local APP_POS = {computerName = global.computerName, applicationName = "POS", applicationVersion = "N/A"}
+
 
 local eventcodes = {
     ------------- SYSTEM EVENT ID's -------------------
@@ -31,8 +41,51 @@ local eventcodes = {
     [998]="FIXED | Scheduled System Restart Recovered",
 }
 
+-- The bulk of winlog traffic is these few IDs; test them before probing eventcodes.
+local MSG_6005, MSG_6006, MSG_12 = eventcodes[6005], eventcodes[6006], eventcodes[12]
+
+
+local id = {}
+-- IDs of Posted entries still waiting for Executed/Finished; scanned on heartbeat.
+local pending = {}
+
+-- Insertion-order ring over id; once ID_CAP entries have been tracked the
+-- oldest one is dropped, so a price change that never reaches Executed/Finished
+-- (or no heartbeat configured) can't grow id without bound.
+local ID_CAP = 4096
+local order_ids, order_entries, order_head = {}, {}, 1
+
+local function track(entryId, entry)
+    local victim = order_ids[order_head]
+    if victim ~= nil and id[victim] == order_entries[order_head] then
+        id[victim] = nil
+    end
+    order_ids[order_head] = entryId
+    order_entries[order_head] = entry
+    order_head = order_head % ID_CAP + 1
+    id[entryId] = entry
+end
+
 
-id = {}
+-- Without a heartbeat nothing else prunes pending, so once it reaches twice ID_CAP
+-- it is compacted to the IDs still tracked in id (at most ID_CAP, one slot each);
+-- evicted, Executed/Finished and re-tracked duplicates are dropped.
+local function add_pending(entryId)
+    if #pending >= 2 * ID_CAP then
+        local seen, kept = {}, 0
+        for i = 1, #pending do
+            local pid = pending[i]
+            local entry = id[pid]
+            if entry and entry.pending and not seen[pid] then
+                seen[pid] = true
+                kept = kept + 1
+                pending[kept] = pid
+            end
+        end
+        for i = #pending, kept + 1, -1 do pending[i] = nil end
+    end
+    pending[#pending + 1] = entryId
+end
 
 
 local function add_label(tbl, key, val)
@@ -40,16 +93,87 @@ local function add_label(tbl, key, val)
 end
 
 
+-- Fuel events get their correlation ID only once they are actually emitted.
+local function emit_fuel(record, body)
+    body["correlationId"] = uuid()
+    return eventFormatter(record, body, "LOG")
+end
+
+
+-- os_time(os_date("!*t")) builds a table per call; recompute it at most once a second.
+local now_utc, now_sec = 0, nil
+
+local function utc_now()
+    local s = os_time()
+    if s ~= now_sec then
+        now_sec = s
+        now_utc = os_time(os_date("!*t", s))
+    end
+    return now_utc
+end
+
+
+-- Radiant messages are "nodes|id|modules|message"; joined through a reused
+-- buffer instead of a chain of `..` so no table or temporaries per record.
+local radiant_buf = {}
+
+local function radiant_message(record)
+    radiant_buf[1] = record["nodes"]
+    radiant_buf[2] = record["id"]
+    radiant_buf[3] = record["modules"]
+    radiant_buf[4] = record["message"]
+    return tconcat(radiant_buf, "|", 1, 4)
+end
+
+
+-- Equivalent of string.match(path, prefix .. ".*%.log$") using plain find/sub,
+-- memoized per prefix and path since a batch mostly comes from the same file.
+local log_names = {}
+
+local function log_name(path, prefix)
+    local cache = log_names[prefix]
+    if not cache then cache = {}; log_names[prefix] = cache end
+
+    local name = cache[path]
+    if name == nil then
+        local s = string_find(path, prefix, 1, true)
+        if s and string_sub(path, -4) == ".log" then
+            name = string_sub(path, s)
+        else
+            name = false
+        end
+        cache[path] = name
+    end
+    return name or nil
+end
+
+-- One-entry "last seen" slot in front of log_name: consecutive records almost
+-- always come from the same file, so most calls return without a hash probe.
+local last_path, last_prefix, last_name
+
+local function cached_log_name(path, prefix)
+    if path == last_path and prefix == last_prefix then return last_name end
+    last_name = log_name(path, prefix)
+    last_path, last_prefix = path, prefix
+    return last_name
+end
+
+
 function logs(tag, timestamp, record)
     local body = {}
 
 
     if tag == "winlog.log" then
-        local tsGen = global.toTimestamp(record["TimeGenerated"])
-        if (os.time(os.date("!*t")) - tsGen) > 86400 then return -1 end
+        local tsGen = toTimestamp(record["TimeGenerated"])
+        if (utc_now() - tsGen) > 86400 then return -1 end
 
         local eventcode = record["EventID"] % 65536
-        local msg = eventcodes[eventcode]; if not msg then return -1 end
+        local msg
+        if eventcode == 6005 then msg = MSG_6005
+        elseif eventcode == 6006 then msg = MSG_6006
+        elseif eventcode == 12 then msg = MSG_12
+        else msg = eventcodes[eventcode] end
+        if not msg then return -1 end
         if (record["Message"] or "") == "" then record["Message"] = msg end
 
         body["labels"] = {recordNumber = tostring(record["RecordNumber"]), channel = record["Channel"], sourceName = record["SourceName"], eventId = tostring(eventcode)}
@@ -58,31 +182,29 @@ function logs(tag, timestamp, record)
         body["message"] = record["Message"]
         body["logName"] = "Winlog - " .. record["SourceName"]
         body["logType"] = "LOG_MESSAGE"
-        return 1, timestamp, global.eventFormatter(record, body, "LOG")
+        return 1, timestamp, eventFormatter(record, body, "LOG")
     elseif (tag == "radiant-logs.log") then 
         body["application"] = {computerName = record["computerName"], applicationName = "SMTOOLS"}
-        body["severity"]  = string.upper(record["severity"]) or "INFO"
-        body["message"] = record["nodes"].."|"..record["id"].."|"..record["modules"].."|"..record["message"]
-        body["logName"] = string.match(record["file_path"], "DCS_SMTOOLS.*%.log$")
+        body["severity"]  = string_upper(record["severity"]) or "INFO"
+        body["message"] = radiant_message(record)
+        body["logName"] = cached_log_name(record["file_path"], "DCS_SMTOOLS")
         body["logType"] = "LOG_MESSAGE"
         body["labels"] = {}
     elseif (tag == "radiant-offlinealert.log") then
         body["application"] = {computerName = record["computerName"], applicationName = "OfflineAlert"}
-        body["severity"]  = string.upper(record["severity"]) or "INFO"
-        body["message"] = record["nodes"].."|"..record["id"].."|"..record["modules"].."|"..record["message"]
-        body["logName"] = string.match(record["file_path"], "DCS_OfflineAlert.*%.log$")
+        body["severity"]  = string_upper(record["severity"]) or "INFO"
+        body["message"] = radiant_message(record)
+        body["logName"] = cached_log_name(record["file_path"], "DCS_OfflineAlert")
         body["logType"] = "LOG_MESSAGE"
         body["labels"] = {["NodeID"] = record["node_id"], ["NodeIP"] = record["node_ip"]}
 
     elseif tag == "fuel.log" then
         if record["message"] == nil then return -1 end
 
-        body["application"] = {computerName = global.computerName, applicationName = "POS", applicationVersion = "N/A"}
-        body["correlationId"] = fc.uuid()
-        body["logName"] = string.match(record["file"], "DCS_FuelPriceChange.*%.log$") or "FuelPriceChange"
+        body["application"] = APP_POS
+        body["logName"] = cached_log_name(record["file"], "DCS_FuelPriceChange") or "FuelPriceChange"
         body["logType"] = "LOG_MESSAGE"
         body["labels"] = {}
-        body["severity"] = string.upper(record["severity"] or "INFO")
 
         local currentId = record["id"]
         local state = record["state"]
@@ -90,20 +212,25 @@ function logs(tag, timestamp, record)
 
 
         if state == "New" then
-            id[currentId] = {record = record, product = record["product"], price = record["price"], timestamp = nil, warned = false}
+            track(currentId, {record = record, product = record["product"], price = record["price"], timestamp = nil, warned = false})
+            body["severity"] = string_upper(record["severity"] or "INFO")
             body["message"] = record["message"] or "No message provided"
             body["labels"]["PriceChangeID"] = currentId
             body["labels"]["ProductID"] = record["product"]
             body["labels"]["Price"] = record["price"]
-            return 1, timestamp, global.eventFormatter(record, body, "LOG")
+            return 1, timestamp, emit_fuel(record, body)
         end
 
         if state == "Posted" then
-            if not entry then entry = {warned=false}; id[currentId]=entry end
+            if not entry then entry = {warned=false}; track(currentId, entry) end
             entry.record = record
             entry.product = record["product"] or entry.product
             entry.price = record["price"] or entry.price
             entry.timestamp = timestamp
+            if not entry.pending then
+                entry.pending = true
+                add_pending(currentId)
+            end
 
             if entry.product then
                 body["labels"]["ProductID"] = entry.product
@@ -113,7 +240,7 @@ function logs(tag, timestamp, record)
             body["status"] = "Posted"
             body["severity"] = "INFO"
             body["message"] = record["message"] or "Price change posted"
-            return 1, timestamp, global.eventFormatter(record, body, "LOG")
+            return 1, timestamp, emit_fuel(record, body)
         end
 
         if state == "Executed" or state == "Finished" then
@@ -126,24 +253,31 @@ function logs(tag, timestamp, record)
             body["severity"] = "OK"
             body["message"] = "Price change ID " .. currentId .. " has been executed successfully."
             id[currentId] = nil
-            return 1, timestamp, global.eventFormatter(record, body, "LOG")
+            return 1, timestamp, emit_fuel(record, body)
         end
 
         body["labels"]["PriceChangeID"] = currentId
+        body["severity"] = string_upper(record["severity"] or "INFO")
         body["message"] = record["message"] or ("State: " .. tostring(state))
-        return 1, timestamp, global.eventFormatter(record, body, "LOG")
+        return 1, timestamp, emit_fuel(record, body)
 
     elseif tag == "heartbeat.log" then
         local recordArr = {}
-        for entryId, entry in pairs(id) do
-            if entry.timestamp and not entry.warned and
-               (timestamp - entry.timestamp) > 600 then
+        local kept = 0
+        for i = 1, #pending do
+            local entryId = pending[i]
+            local entry = id[entryId]
+            if entry and entry.timestamp and not entry.warned and
+               (timestamp - entry.timestamp) <= 600 then
+                kept = kept + 1
+                pending[kept] = entryId
+            elseif entry and entry.timestamp and not entry.warned then
                 body[entryId] = {}
-                body[entryId]["application"] = {computerName = global.computerName, applicationName = "POS",applicationVersion = "N/A"}
-                body[entryId]["correlationId"] = fc.uuid()
+                body[entryId]["application"] = APP_POS
+                body[entryId]["correlationId"] = uuid()
                 body[entryId]["logType"] = "LOG_MESSAGE"
                 body[entryId]["severity"] = "WARN"
-                body[entryId]["logName"] = string.match(entry.record.file,"DCS_FuelPriceChange.*%.log$") or "FuelPriceChange"
+                body[entryId]["logName"] = cached_log_name(entry.record.file, "DCS_FuelPriceChange") or "FuelPriceChange"
                 body[entryId]["message"] = "Did not receive EXECUTED/FINISHED state within 10 minutes for ID " .. entryId .. "."
                 body[entryId]["labels"] = {PriceChangeID = entryId}
 
@@ -152,10 +286,12 @@ function logs(tag, timestamp, record)
                     body[entryId]["labels"]["Price"] = entry.price
                 end
 
-                table.insert(recordArr, global.eventFormatter(record, body[entryId], "LOG"))
+                tinsert(recordArr, eventFormatter(record, body[entryId], "LOG"))
                 entry.warned = true
             end
         end
+        -- drop warned/finished IDs so the list only holds live candidates
+        for i = #pending, kept + 1, -1 do pending[i] = nil end
 
         if #recordArr == 0 then
             return -1
@@ -163,186 +299,6 @@ function logs(tag, timestamp, record)
             return 1, timestamp, recordArr
         end
     end
-    local newRecord = global.eventFormatter(record, body, "LOG")
-    return 1, timestamp, newRecord
-end
-
-
-
-package.path = package.path .. [[;C:\Program Files (x86)\NCR\CSM2.0\ftp\PulseAgent\PST\Install\fluentBit\config\lua\?.lua;]]
-local fc = require('fluentCommon')
-local global = require('global')
-
-local eventcodes = {
-    ------------- SYSTEM EVENT ID's -------------------
-    [12]="The operating system started",
-    [13]="The operating system is shutting down",
-    [41]="The system has rebooted without cleanly shutting down first. This error could be caused if the system stopped responding, crashed, or lost power unexpectedly.",
-    [52]="HD bad blocks marked",
-    [109]="The kernel power manager has initiated a shutdown transition.",
-    [6005]="The Event log service was started.",
-    [6006]="The Event log service was stopped.",
-    [6008]="The previous system shutdown was unexpected.",
-    ---------------- APPLICATION EVENT ID's --------------------
-    [5]="PMLLog",
-    [750]="DCSOps",
-    [751]="DCSOps",
-    [752]="DCSOps",
-    [753]="DCSOps",
-    [754]="DCSOps",
-    [755]="DCSOps",
-    [7206]="CRITICAL | A Disk Drive in RAID1 Volume is Degraded",
-    [7001]="WARNING | A Disk Drive in the RAID1 Volume has been removed",
-    [7209]="WARNING | Verification and Repair in progress for RAID Volume",
-    [7207]="INFORMATION | A Disk Drive in RAID1 Volume, Rebuilding is complete",
-    [7000]="FIXED | A Disk Drive in RAID1 Volume has been detected",
-    [999]="INVESTIGATE | BOPC OFFLINE after Scheduled Reboot",
-    [998]="FIXED | Scheduled System Restart Recovered",
-}
-
-id = {}
-
-function logs(tag, timestamp, record)
-    local body = {}
-    if (tag == "winlog.log") then
-        local timeStamp = global.toTimestamp(record["TimeGenerated"])
-        if (os.time(os.date("!*t")) - timeStamp) > 60 * 60 * 24 then --everything older than 1 day
-            return -1, timestamp, record
-        end
-        local eventcode = record["EventID"] % 65536
-        local message = eventcodes[eventcode]
-        if message == nil then
-            return -1, timestamp, record
-        end
-
-        if record["Message"] == "" then
-            record["Message"] = message
-        end
-        body["labels"] = {recordNumber = tostring(record["RecordNumber"]), channel = record["Channel"], sourceName = record["SourceName"], eventId = tostring(eventcode)}
-        body["application"] = {computerName = record["computerName"], applicationName = record["SourceName"]}
-        body["severity"] = record["EventType"]
-        body["message"] = record["Message"]
-        body["logName"] = "Winlog - " .. record["SourceName"]
-        body["logType"] = "LOG_MESSAGE"
-    elseif (tag == "radiant-logs.log") then 
-        body["application"] = {computerName = record["computerName"], applicationName = "SMTOOLS"}
-        body["severity"]  = string.upper(record["severity"]) or "INFO"
-        body["message"] = record["nodes"].."|"..record["id"].."|"..record["modules"].."|"..record["message"]
-        body["logName"] = string.match(record["file_path"], "DCS_SMTOOLS.*%.log$")
-        body["logType"] = "LOG_MESSAGE"
-        body["labels"] = {}
-    elseif (tag == "radiant-offlinealert.log") then
-        body["application"] = {computerName = record["computerName"], applicationName = "OfflineAlert"}
-        body["severity"]  = string.upper(record["severity"]) or "INFO"
-        body["message"] = record["nodes"].."|"..record["id"].."|"..record["modules"].."|"..record["message"]
-        body["logName"] = string.match(record["file_path"], "DCS_OfflineAlert.*%.log$")
-        body["logType"] = "LOG_MESSAGE"
-        body["labels"] = {["NodeID"] = record["node_id"], ["NodeIP"] = record["node_ip"]}
-    elseif (tag == "fuel.log") then
-
-        if record["message"] == nil then
-            return -1
-        end
-        
-        body["application"] = {computerName = global.computerName, applicationName = "POS", applicationVersion = "N/A"}
-        body["correlationId"] = fc.uuid()
-        body["logName"] = string.match(record["file"], "DCS_FuelPriceChange.*%.log$")
-        body["logType"] = "LOG_MESSAGE"
-        body["labels"] = {}
-        if record["severity"] ~= nil then
-            body["severity"]  = string.upper(record["severity"])
-        else
-            body["severity"] = "INFO"
-        end
-
-        if (record["state"] == "New") then   
-            id[record["id"]] = {record = record, timestamp = nil}
-            body["message"] = record["message"] or record["Message"] or "No message provided"
-            local newRecord = global.eventFormatter(record, body, "LOG")
-            return 1, timestamp, newRecord
-        end
-
-        if (record["state"] == "Posted") then
-            if id[record["id"]] == nil then             -- if we don't have record with state "New" in memory, just use the record as posted. 
-                id[record["id"]] = {record = record}    -- we don't have access to Product and Price if this is the case.
-            end
-            id[record["id"]]["timestamp"] = timestamp
-        end
-
-        local healthy = false
-        -- if the record contains a healthy event, send it as such and remove it from the list 
-        local currentId = record["id"] 
-        if (record["state"] == "Executed" or record["state"] == "Finished") then
-            body["message"] = "Price change ID " .. currentId .. " has been executed successfully."
-
-            if id[currentId] ~= nil and id[currentId]["record"]["product"] ~= nil  then --if we have product and price, include them
-                body["labels"]["ProductID"] = id[currentId]["record"]["product"]
-                body["labels"]["Price"] = id[currentId]["record"]["price"]
-            end
-
-            body["labels"]["PriceChangeID"] = currentId
-
-            id[currentId] = nil
-            healthy = true
-        end
-
-        if not healthy then
-            body["message"] = record["message"] or record["Message"] or "No message provided"
-            body["severity"] = record["severity"] or "INFO"
-            local newRecord = global.eventFormatter(record, body, "LOG")
-            return 1, timestamp, newRecord
-        else 
-            local recordArr = {}
-            local newRecord = global.eventFormatter(record, body, "LOG")
-            table.insert(recordArr, newRecord)
-
-            local newBody = {}
-            newBody["application"] = {computerName = global.computerName, applicationName = "POS", applicationVersion = "N/A"}
-            newBody["correlationId"] = fc.uuid()
-            newBody["logName"] = string.match(record["file"], "DCS_FuelPriceChange.*%.log$")
-            newBody["logType"] = "LOG_MESSAGE"
-            newBody["message"] = record["message"] or record["Message"] or "No message provided"
-            newBody["severity"] = record["severity"] or "INFO"
-
-            local origRecord = global.eventFormatter(record, newBody, "LOG")
-            table.insert(recordArr, origRecord)
-
-            return 1, timestamp, recordArr
-        end
-    elseif (tag == "heartbeat.log") then -- check for and send unhealthy event for fuel price change
-        local recordArr = {} 
-        for entryId, entry in pairs(id) do
-            if(entry["timestamp"] ~= nil) then
-                local elapsedTime = timestamp - entry["timestamp"]
-                if (elapsedTime > 600) then
-                    body[entryId] = {}
-                    body[entryId]["application"] = {computerName = global.computerName, applicationName = "POS", applicationVersion = "N/A"}
-                    body[entryId]["correlationId"] = fc.uuid()
-                    body[entryId]["logType"] = "LOG_MESSAGE"
-                    body[entryId]["labels"] = {}
-                    body[entryId]["message"] = "Did not receive EXECUTED/FINISHED state within 10 minutes for ID " .. entryId .. "."
-                    body[entryId]["severity"] = "WARN"
-                    body[entryId]["logName"] = string.match(entry["record"]["file"], "DCS_FuelPriceChange.*%.log$")
-
-                    if id[entryId]["record"]["product"] ~= nil then 
-                        body[entryId]["labels"]["ProductID"] = id[entryId]["record"]["product"]
-                        body[entryId]["labels"]["Price"] = id[entryId]["record"]["price"]
-                    end
-
-                    body[entryId]["labels"]["PriceChangeID"] = entryId
-
-                    table.insert(recordArr, global.eventFormatter(record, body[entryId], "LOG"))
-                    id[entryId] = nil
-                end
-            end
-        end
-
-        if (#recordArr == 0) then
-            return -1
-        else
-            return 1, timestamp, recordArr
-        end
-    end
-    local newRecord = global.eventFormatter(record, body, "LOG")
+    local newRecord = eventFormatter(record, body, "LOG")
     return 1, timestamp, newRecord
 end
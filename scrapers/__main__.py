@@ -0,0 +1,40 @@
+"""
+Runs the browser scrapers side by side on one event loop: python -m scrapers
+
+They target different sites and share no state. The standalone scrapers (mbet,
+mdshop, Soccerbet) each run in a worker process with their own Chrome, so their
+parsing doesn't contend for one GIL; Meridian, Mozzart and Sportplus share the
+in-process driver pool and run in executor threads. run.py remains the entry point for the
+full crawl.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import logging
+
+from scrapers import (
+    scraper_mbet, scraper_mdshop, scraper_meridian, scraper_mozza, scraper_soccer, scraper_sportplus,
+)
+
+# Scrapers that start their own Chrome and can run in a separate process
+PROCESS_SCRAPERS = (scraper_mbet, scraper_mdshop, scraper_soccer)
+# Scrapers on the shared driver pool, run through their run_async()
+POOLED_SCRAPERS = (scraper_meridian, scraper_mozza, scraper_sportplus)
+
+
+async def main():
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=len(PROCESS_SCRAPERS)) as processes:
+        names = [scraper.__name__ for scraper in PROCESS_SCRAPERS + POOLED_SCRAPERS]
+        # One scraper raising must not cancel the wait for the others
+        results = await asyncio.gather(
+            *(loop.run_in_executor(processes, scraper.run) for scraper in PROCESS_SCRAPERS),
+            *(scraper.run_async() for scraper in POOLED_SCRAPERS),
+            return_exceptions=True,
+        )
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            logging.error(f"Error in {name}: {result!r}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
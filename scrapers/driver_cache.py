@@ -0,0 +1,148 @@
+import os
+import shutil
+import logging
+import tempfile
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+# Chrome is started through Selenium Manager (bundled with Selenium 4.11+), which
+# resolves and caches a matching driver itself. webdriver-manager is only the fallback:
+# ChromeDriverManager().install() checks for the latest driver over HTTP on every call,
+# so the path it resolves is kept in memory and in a small file in the user's home.
+# Set CHROMEDRIVER=/path/to/chromedriver to pin a driver and skip both managers.
+PATH_FILE = os.path.join(os.path.expanduser("~"), ".sure_bet_chromedriver_path")
+
+_cached_path = None
+_lock = threading.Lock()  # scrapers may create drivers from several threads
+
+# Persistent Chrome profiles keep the HTTP/V8 code caches between runs. Long-lived
+# profiles make Chrome slower over time, so one is wiped after PROFILE_MAX_RUNS starts.
+PROFILE_ROOT = os.path.join(tempfile.gettempdir(), "sure_bet_chrome_profiles")
+PROFILE_MAX_RUNS = 50
+
+
+def get_driver_path():
+    """
+    Returns the ChromeDriver binary path, only asking ChromeDriverManager
+    when no cached path exists on disk. A path pinned through the CHROMEDRIVER
+    environment variable is used as is and skips the manager entirely.
+    """
+    global _cached_path
+    pinned = os.environ.get("CHROMEDRIVER")
+    if pinned:
+        return pinned
+
+    with _lock:
+        if _cached_path and os.path.exists(_cached_path):
+            return _cached_path
+
+        try:
+            with open(PATH_FILE) as f:
+                path = f.read().strip()
+        except OSError:
+            path = ""
+
+        if not (path and os.path.exists(path)):
+            # Imported here, only the fallback path pays for webdriver-manager
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+            try:
+                with open(PATH_FILE, "w") as f:
+                    f.write(path)
+            except OSError as e:
+                logging.warning(f"Could not cache ChromeDriver path: {e}")
+
+        _cached_path = path
+        return path
+
+
+def invalidate_driver_path():
+    """
+    Forgets the cached ChromeDriver path so the next lookup reinstalls it.
+    """
+    global _cached_path
+    with _lock:
+        _cached_path = None
+        try:
+            os.remove(PATH_FILE)
+        except FileNotFoundError:
+            pass
+
+
+def profile_dir(name):
+    """
+    Returns the persistent profile directory for name, resetting it every PROFILE_MAX_RUNS uses.
+    """
+    path = os.path.join(PROFILE_ROOT, name)
+    counter_file = os.path.join(path, "sure_bet_runs")
+    try:
+        with open(counter_file) as f:
+            runs = int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        runs = 0
+
+    if runs >= PROFILE_MAX_RUNS:
+        logging.info(f"Resetting Chrome profile '{name}' after {runs} runs.")
+        shutil.rmtree(path, ignore_errors=True)
+        runs = 0
+
+    os.makedirs(path, exist_ok=True)
+    try:
+        with open(counter_file, "w") as f:
+            f.write(str(runs + 1))
+    except OSError as e:
+        logging.warning(f"Could not update run counter for profile '{name}': {e}")
+    return path
+
+
+def create_chrome(options, profile=None):
+    """
+    Starts Chrome through Selenium Manager, or with the cached webdriver-manager driver
+    if that fails; see _start_chrome.
+
+    With profile set, Chrome runs on a persistent user-data-dir of that name so caches
+    survive between runs; if the profile is locked by another Chrome, it starts without one.
+    """
+    if profile:
+        path = profile_dir(profile)
+        profile_args = [f"--user-data-dir={path}",
+                        f"--disk-cache-dir={os.path.join(path, 'cache')}",
+                        "--aggressive-cache-discard=false"]
+        for arg in profile_args:
+            options.add_argument(arg)
+        try:
+            return _start_chrome(options)
+        except SessionNotCreatedException as e:
+            logging.warning(f"Chrome profile '{profile}' unavailable, using a throwaway one: {e}")
+            for arg in profile_args:
+                options.arguments.remove(arg)
+
+    return _start_chrome(options)
+
+
+def _start_chrome(options):
+    """
+    Starts Chrome on the pinned driver, else through Selenium Manager, falling back to
+    the cached webdriver-manager path (reinstalled once if it no longer matches Chrome).
+    A SessionNotCreatedException from Selenium Manager (e.g. a locked profile) is raised as is.
+    """
+    pinned = os.environ.get("CHROMEDRIVER")
+    if pinned:
+        return webdriver.Chrome(service=Service(pinned), options=options)
+
+    try:
+        return webdriver.Chrome(options=options)
+    except SessionNotCreatedException:
+        raise
+    except WebDriverException as e:
+        logging.warning(f"Selenium Manager could not start Chrome, using webdriver-manager: {e}")
+
+    try:
+        return webdriver.Chrome(service=Service(get_driver_path()), options=options)
+    except WebDriverException as e:
+        logging.warning(f"Chrome failed to start with cached driver, reinstalling: {e}")
+        invalidate_driver_path()
+        return webdriver.Chrome(service=Service(get_driver_path()), options=options)
@@ -0,0 +1,165 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from scrapers.driver_cache import create_chrome
+
+
+# Seconds a run waits for a pooled driver before acquire() raises queue.Empty
+ACQUIRE_TIMEOUT = 300
+
+
+def default_options():
+    """
+    Headless Chrome options shared by the pooled scrapers (Meridian, Mozzart, Sportplus).
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-extensions")
+    # Pooled drivers work in background tabs/windows; keep their timers and rendering at full speed
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    # get() returns at DOMContentLoaded; the pooled scrapers wait for the elements they need
+    options.page_load_strategy = 'eager'
+    # Custom User-Agent to mimic real browser behavior
+    options.add_argument(
+        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/131.0.0.0 Safari/537.36"
+    )
+    # Only text is scraped: skip images/fonts/notifications
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    return options
+
+
+# Requests dropped at the network layer for every pooled driver
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.ttf",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*facebook.net*", "*hotjar*",
+]
+
+
+def block_resources(driver):
+    """
+    Blocks images, fonts and tracker hosts through CDP; failures are only logged.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except Exception as e:
+        logging.warning(f"Could not set blocked URLs: {e}")
+
+
+class DriverPool:
+    """
+    Keeps up to `size` Chrome sessions alive between scraper runs, so a run only
+    navigates an already started browser instead of paying Chrome startup again.
+
+    Drivers are created lazily on first acquire(); release() resets cookies and
+    the page before the driver goes back to the pool. Waiters are woken both when
+    a driver is released and when one is discarded, so a freed slot gets a new Chrome.
+    """
+
+    def __init__(self, size=2, options_factory=default_options):
+        self._size = size
+        self._options_factory = options_factory
+        self._idle = []
+        self._drivers = []
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        """
+        Returns an idle driver, starting a new one while the pool is below its size.
+        Blocks up to timeout seconds when all drivers are in use, then raises queue.Empty.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._drivers) < self._size:
+                    self._drivers.append(None)  # reserve the slot while Chrome starts
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+
+        try:
+            driver = create_chrome(self._options_factory())
+            block_resources(driver)
+        except Exception:
+            with self._cond:
+                self._drivers.remove(None)
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._drivers[self._drivers.index(None)] = driver
+        return driver
+
+    def release(self, driver):
+        """
+        Resets the driver and returns it to the pool; a driver that no longer
+        responds is quit and dropped instead.
+        """
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except WebDriverException as e:
+            logging.warning(f"Dropping unresponsive pooled driver: {e}")
+            self.discard(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def discard(self, driver):
+        """
+        Quits the driver and frees its slot in the pool, waking one waiter to fill it.
+        """
+        with self._cond:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._cond.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        Quits every driver the pool has started.
+        """
+        with self._cond:
+            drivers = [d for d in self._drivers if d is not None]
+            self._drivers.clear()
+            self._idle.clear()
+            self._cond.notify_all()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+DRIVER_POOL = DriverPool()
+atexit.register(DRIVER_POOL.close)
@@ -1,10 +1,14 @@
 import os
-import time
-import pickle
+import re
+import joblib
 import logging
 import datetime
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
+from lxml import html
 from selenium import webdriver
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
@@ -18,8 +22,68 @@ from selenium.common.exceptions import (
     WebDriverException,
     ElementClickInterceptedException
 )
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+
+from scrapers.driver_cache import create_chrome
+
+logger = logging.getLogger("scraper_mbet")
+
+# Selectors for the match table and the Fudbal subnav
+_SEL_ROW = "div[class*='global-style_table_row__']"
+_SEL_TIME_COL = "div[class*='global-style_time_col__']"
+_SEL_TIME = "span[class*='global-style_time__']"
+_SEL_DATE = "span[class*='global-style_date__']"
+_SEL_HOME = "div[class*='global-style_team_home__']"
+_SEL_AWAY = "div[class*='global-style_team_away__']"
+_SEL_MKT = "div[class*='global-style_market_width_3__']"
+_SEL_STAKE = "button[class*='global-style_stake_type_btn__']"
+_SEL_SUBNAV = "div[class*='global-style_subnav__']"
+_SEL_NAV_LABEL = "div[class*='global-style_nav_item_label__']"
+_XPATH_FUDBAL = (
+    "//div[contains(@class, 'global-style_nav_item__') "
+    "      and .//div[contains(@class, 'global-style_nav_item_label__') and text()='Fudbal']]"
+)
+_NAV_CONTENT_CLS = re.compile(r"global-style_nav_item_content__")
+_NAV_LABEL_CLS = re.compile(r"global-style_nav_item_label__")
+_XPATH_NAV_CONTENT = ".//div[contains(@class, 'global-style_nav_item_content__')]"
+_XPATH_SUBCAT = (
+    ".//div[contains(@class, 'global-style_nav_item_label__') "
+    " and normalize-space(text())='%s']"
+    "/ancestor::div[contains(@class, 'global-style_nav_item_content__')]"
+)
+
+# Reads every match row in one round-trip instead of ~10 WebDriver calls per row.
+# Takes the selector dict below as arguments[0].
+MATCH_ROWS_JS = """
+const sel = arguments[0];
+const txt = (root, s) => {
+    const el = root ? root.querySelector(s) : null;
+    return el ? el.textContent.trim() : null;
+};
+return Array.from(document.querySelectorAll(sel.row)).map(row => {
+    const market = row.querySelector(sel.market);
+    // Only 1/X/2 are used, so at most three stake texts are sent back per row
+    const stakes = market ? market.querySelectorAll(sel.stake) : [];
+    const odds = [];
+    for (let i = 0; i < stakes.length && i < 3; i++) odds.push(stakes[i].textContent.trim());
+    return {
+        time: txt(row, sel.time),
+        date: txt(row, sel.date),
+        home: txt(row, sel.home),
+        away: txt(row, sel.away),
+        odds: odds
+    };
+});
+"""
+MATCH_ROWS_SELECTORS = {
+    "row": _SEL_ROW,
+    # Chained through the time column so each is a single query from the row
+    "time": f"{_SEL_TIME_COL} {_SEL_TIME}",
+    "date": f"{_SEL_TIME_COL} {_SEL_DATE}",
+    "home": _SEL_HOME,
+    "away": _SEL_AWAY,
+    "market": _SEL_MKT,
+    "stake": _SEL_STAKE,
+}
 
 def safe_click(driver, element, label="(unknown)"):
     """
@@ -32,273 +96,425 @@ def safe_click(driver, element, label="(unknown)"):
         element.click()
         return True
     except ElementClickInterceptedException as e1:
-        logging.warning(f"ElementClickIntercepted on {label}: {e1}. Trying JS click.")
+        logger.warning("ElementClickIntercepted on %s: %s. Trying JS click.", label, e1)
         try:
             driver.execute_script("arguments[0].click();", element)
             return True
         except Exception as e2:
-            logging.warning(f"JS click also failed for {label}: {e2}")
+            logger.warning("JS click also failed for %s: %s", label, e2)
             return False
     except Exception as e:
-        logging.warning(f"Unexpected click failure on {label}: {e}")
+        logger.warning("Unexpected click failure on %s: %s", label, e)
         return False
 
-def run():
-    log_dir = "log"
-    os.makedirs(log_dir, exist_ok=True)
-    logging.basicConfig(
-        filename=os.path.join(log_dir, "scraper_mbet.log"),
-        filemode="w",
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+def _rows_snapshot(driver):
+    """
+    Returns (row count, first row text) for the current match table.
+    """
+    rows = driver.find_elements(By.CSS_SELECTOR, _SEL_ROW)
+    return len(rows), (rows[0].text if rows else "")
+
+def wait_for_rows_change(driver, prev_snapshot, timeout=5):
+    """
+    Waits until the match table differs from prev_snapshot (row count or first row text).
+    Returns False on timeout instead of raising.
+    """
+    try:
+        WebDriverWait(
+            driver, timeout, poll_frequency=0.2,
+            ignored_exceptions=(StaleElementReferenceException,)
+        ).until(lambda d: _rows_snapshot(d) != prev_snapshot)
+        return True
+    except TimeoutException:
+        return False
+
+def scroll_until_rows_stable(driver, max_scrolls=30):
+    """
+    Scrolls one viewport at a time until the match row count stops growing
+    for two consecutive scrolls (or max_scrolls is reached). Returns the final row count.
+    """
+    def row_count(d):
+        return len(d.find_elements(By.CSS_SELECTOR, _SEL_ROW))
+
+    prev_count = -1
+    stable = 0
+    for _ in range(max_scrolls):
+        count = row_count(driver)
+        if count == prev_count:
+            stable += 1
+            if stable >= 2:
+                break
+        else:
+            stable = 0
+        prev_count = count
+
+        driver.execute_script("window.scrollBy(0, window.innerHeight);")
+        try:
+            WebDriverWait(driver, 1, poll_frequency=0.2).until(lambda d: row_count(d) > prev_count)
+        except TimeoutException:
+            pass
+    return prev_count
+
+WEB = "https://mbet.ba/prematch"
+MAX_SUBCAT_WORKERS = 4  # Parallel Chrome sessions for the subcategory loop
+# Subcategories the prematch page already shows when opened; they are read without a click
+DEFAULT_VIEW_LABELS = ("ENGLAND 1 (England)", "Košarka special")
 
-    logging.info("Starting scraper_mbet")
-    web = "https://mbet.ba/prematch"
+def parse_kickoff(d_text, t_text, year):
+    """
+    Builds a datetime from mbet's "23.12." date and "04:30" time columns.
+    Raises ValueError if either part is malformed.
+    """
+    day, month = d_text.rstrip(".").split(".")
+    hour, minute = t_text.split(":")
+    return datetime.datetime(year, int(month), int(day), int(hour), int(minute))
 
+def create_driver(profile="mbet"):
+    """
+    Creates a headless Chrome WebDriver configured for scraping, on the named persistent profile.
+    """
     options = webdriver.ChromeOptions()
     options.add_argument("--start-maximized")
     options.add_argument("--headless")  # Uncomment if needed
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
+    # Only text is scraped: skip images/fonts/notifications and return from get() at DOMContentLoaded
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    return create_chrome(options, profile=profile)
+
+def open_fudbal_subnav(driver):
+    """
+    Navigates to the prematch page and returns the subnav container of the Fudbal
+    nav item, or None if it cannot be found.
+    """
+    driver.get(WEB)
+    logger.info("Navigated to %s", WEB)
 
-    # Prepare lists for final DataFrame
-    match_times   = []
-    match_dates   = []
-    home_teams    = []
-    away_teams    = []
-    odds_1        = []
-    odds_x        = []
-    odds_2        = []
+    # Locate the Fudbal container
+    try:
+        fudbal_container = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.XPATH, _XPATH_FUDBAL))
+        )
+        logger.info("Located the Fudbal container.")
+    except TimeoutException:
+        logger.error("Fudbal container not found.")
+        return None
 
+    # Find the subnav container inside that Fudbal container
     try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
+        subnav_container = fudbal_container.find_element(
+            By.CSS_SELECTOR, _SEL_SUBNAV
         )
-        logging.info("WebDriver initialized successfully.")
-    except WebDriverException as e:
-        logging.error(f"Error initializing WebDriver: {e}")
-        return
+        logger.info("Found subnav container inside the Fudbal container.")
+    except NoSuchElementException:
+        logger.error("No subnav container in the Fudbal container.")
+        return None
+    return subnav_container
 
+def snapshot_subcat_labels(subnav_container):
+    """
+    Returns the label text of every subcategory under the subnav container, in
+    document order (None where a subcategory has no label), parsed offline with lxml.
+    """
+    root = html.fromstring(subnav_container.get_attribute("outerHTML"))
+    labels = []
+    for subcat in root.iterdescendants("div"):
+        if not _NAV_CONTENT_CLS.search(subcat.get("class") or ""):
+            continue
+        label_el = next((el for el in subcat.iterdescendants("div")
+                         if _NAV_LABEL_CLS.search(el.get("class") or "")), None)
+        labels.append(label_el.text_content().strip() if label_el is not None else None)
+    return labels
+
+def collect_subcats(subnav_container):
+    """
+    Returns (label, subcategory element) pairs for the Fudbal subnav, skipping
+    empty and BONUS TIP entries. The elements are reused for clicking later.
+    """
+    subcategories = subnav_container.find_elements(
+        By.XPATH, _XPATH_NAV_CONTENT
+    )
+    logger.info("Found %d subcategories in Fudbal container.", len(subcategories))
+
+    # Read all labels from one outerHTML snapshot instead of a find_element +
+    # get_attribute round-trip per subcategory; the live elements are matched by index.
+    labels = snapshot_subcat_labels(subnav_container)
+    if len(labels) != len(subcategories):
+        logger.warning("Subnav snapshot has %d subcategories, live DOM %d; reading labels one by one.",
+                       len(labels), len(subcategories))
+        labels = None
+
+    subcat_entries = []
+    for idx, subcat in enumerate(subcategories):
+        try:
+            if labels is not None:
+                label_text = labels[idx]
+            else:
+                label_el = subcat.find_element(
+                    By.CSS_SELECTOR, _SEL_NAV_LABEL
+                )
+                label_text = label_el.get_attribute("textContent").strip()
+            if label_text is None:
+                raise NoSuchElementException("no label element")
+            if not label_text:
+                logger.debug("Skipping subcat at idx=%d, label is empty.", idx)
+                continue
+            if "BONUS TIP" in label_text.upper():
+                logger.debug("Skipping bonus subcat: %s", label_text)
+                continue
+
+            subcat_entries.append((label_text, subcat))
+        except Exception as sub_e:
+            logger.warning("Problem reading label from subcat idx=%d: %s", idx, sub_e)
+    return subcat_entries
+
+def open_subcat(driver, subcat_elem, label):
+    """
+    Scrolls to, hovers and clicks a subcategory, then waits for its matches to load.
+    Returns False if the click failed.
+    """
+    # Scroll subcat element into center
+    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", subcat_elem)
     try:
-        driver.get(web)
-        logging.info(f"Navigated to {web}")
-        time.sleep(2)
+        WebDriverWait(driver, 2).until(EC.visibility_of(subcat_elem))
+    except TimeoutException:
+        pass
 
-        current_year = datetime.datetime.now().year
+    # Optional: Hover using ActionChains
+    ActionChains(driver).move_to_element(subcat_elem).pause(0.3).perform()
+
+    # Attempt to click
+    prev_snapshot = _rows_snapshot(driver)
+    if not safe_click(driver, subcat_elem, label=label):
+        return False
 
-        # Locate the Fudbal container
+    # let matches load
+    if not wait_for_rows_change(driver, prev_snapshot):
+        logger.warning("Match table did not change after clicking '%s'.", label)
+    return True
+
+def is_default_view(label):
+    """
+    True if label is one of the DEFAULT_VIEW_LABELS subcategories.
+    """
+    return any(default in label for default in DEFAULT_VIEW_LABELS)
+
+def scrape_subcat(driver, subnav_container, label, subcat_elem, current_year):
+    """
+    Opens one subcategory and returns its matches as a list of row dicts.
+    subcat_elem is the cached subcategory element; it is only re-found if it went stale.
+    Default-view labels are not clicked, so driver must be on the freshly opened page.
+    """
+    rows = []
+    logger.debug("Processing subcategory: %s", label)
+    if is_default_view(label):
+        logger.debug("Skipping click for already present subcategory: %s", label)
+    else:
         try:
-            fudbal_container = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((
-                    By.XPATH,
-                    "//div[contains(@class, 'global-style_nav_item__') "
-                    "      and .//div[contains(@class, 'global-style_nav_item_label__') and text()='Fudbal']]"
-                ))
+            if subcat_elem is None:
+                raise StaleElementReferenceException(f"No cached element for '{label}'")
+            opened = open_subcat(driver, subcat_elem, label)
+        except StaleElementReferenceException:
+            # The subnav was re-rendered; look up just this subcategory again
+            subcat_elem = WebDriverWait(subnav_container, 10).until(
+                EC.presence_of_element_located((By.XPATH, _XPATH_SUBCAT % label))
             )
-            logging.info("Located the Fudbal container.")
-        except TimeoutException:
-            logging.error("Fudbal container not found. Exiting.")
-            driver.quit()
-            return
+            opened = open_subcat(driver, subcat_elem, label)
+
+        if not opened:
+            logger.warning("Skipping subcategory '%s' - could not click.", label)
+            return rows
+
+    # Scroll until no new rows show up
+    scroll_until_rows_stable(driver)
 
-        # Find the subnav container inside that Fudbal container
+    # Now collect match rows (single JS call)
+    match_rows = driver.execute_script(MATCH_ROWS_JS, MATCH_ROWS_SELECTORS) or []
+    logger.debug("Found %d matches under subcategory: %s", len(match_rows), label)
+
+    # Parse each row
+    for row in match_rows:
         try:
-            subnav_container = fudbal_container.find_element(
-                By.CSS_SELECTOR, "div[class*='global-style_subnav__']"
-            )
-            logging.info("Found subnav container inside the Fudbal container.")
-        except NoSuchElementException:
-            logging.error("No subnav container in the Fudbal container. Exiting.")
-            driver.quit()
-            return
+            # Time & date
+            t_text, d_text = row["time"], row["date"]
+            if t_text is None or d_text is None:
+                logger.warning("Skipping row in subcat '%s': no time/date column.", label)
+                continue
+
+            # Teams
+            home_text = away_text = ""
+            if row["home"] is not None and row["away"] is not None:
+                home_text, away_text = row["home"], row["away"]
+            else:
+                logger.debug("No home/away found for row.")
+
+            # Try parse
+            dt_combined = None
+            try:
+                dt_combined = parse_kickoff(d_text, t_text, current_year)
+            except ValueError as ve:
+                logger.warning("Date parse error for '%s vs %s': %s", home_text, away_text, ve)
+
+            # Odds (1, x, 2) from the first market block
+            o1, ox, o2 = "", "", ""
+            if len(row["odds"]) >= 3:
+                o1, ox, o2 = row["odds"][:3]
+
+            # Only keep rows with a valid parsed date/time
+            if dt_combined:
+                rows.append({
+                    "time": dt_combined,
+                    "date": d_text,
+                    "home": home_text,
+                    "away": away_text,
+                    "1": o1,
+                    "x": ox,
+                    "2": o2
+                })
+            else:
+                logger.warning("Skipping row: no valid date/time for '%s vs %s'.", home_text, away_text)
+
+        except Exception as row_ex:
+            logger.warning("Error parsing match row in subcat '%s': %s", label, row_ex)
+
+    logger.debug("Done subcategory: %s", label)
+    return rows
 
-        # Collect subcategory blocks
-        subcategories = subnav_container.find_elements(
-            By.XPATH, ".//div[contains(@class, 'global-style_nav_item_content__')]"
-        )
-        logging.info(f"Found {len(subcategories)} subcategories in Fudbal container.")
+def run():
+    log_dir = "log"
+    os.makedirs(log_dir, exist_ok=True)
+    # Own logger and file handler instead of basicConfig, which only configures the
+    # shared root logger once per process (run.py runs the scrapers side by side)
+    for old_handler in logger.handlers[:]:
+        logger.removeHandler(old_handler)
+        old_handler.close()
+    handler = logging.FileHandler(os.path.join(log_dir, "scraper_mbet.log"), mode="w")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+    logger.info("Starting scraper_mbet")
+
+    # Rows for the final DataFrame, keyed by (home, away, time) so duplicates collapse as they arrive
+    rows = {}
+
+    try:
+        driver = create_driver()
+        logger.info("WebDriver initialized successfully.")
+    except WebDriverException as e:
+        logger.error("Error initializing WebDriver: %s", e)
+        return
+
+    # Worker sessions for the subcategory pool, one per thread
+    worker_drivers = []
+    drivers_lock = threading.Lock()
+    local = threading.local()
+    worker_ids = itertools.count()
+
+    def worker_session():
+        if getattr(local, "failed", False):
+            # This worker's Chrome already failed to set up; don't start another per label
+            raise RuntimeError("Worker session is unavailable.")
+        session = getattr(local, "session", None)
+        if session is None:
+            local.failed = True  # cleared once the session is up
+            # Each worker gets its own profile; Chrome locks a user-data-dir per process
+            worker_driver = create_driver(profile=f"mbet_worker{next(worker_ids)}")
+            with drivers_lock:
+                worker_drivers.append(worker_driver)
+            worker_subnav = open_fudbal_subnav(worker_driver)
+            if worker_subnav is None:
+                raise RuntimeError("Worker could not open the Fudbal subnav.")
+            session = local.session = (worker_driver, worker_subnav, dict(collect_subcats(worker_subnav)))
+            local.moved = False  # still on the page's default view
+            local.failed = False
+        return session
+
+    def scrape_label(label):
+        worker_driver, worker_subnav, worker_subcats = worker_session()
+        if is_default_view(label) and local.moved:
+            # Sessions are reused across labels; reload the page so the default view
+            # is read instead of whichever subcategory this worker opened last
+            worker_subnav = open_fudbal_subnav(worker_driver)
+            if worker_subnav is None:
+                raise RuntimeError("Worker could not reopen the Fudbal subnav.")
+            worker_subcats = dict(collect_subcats(worker_subnav))
+            local.session = (worker_driver, worker_subnav, worker_subcats)
+        local.moved = not is_default_view(label)
+        return scrape_subcat(worker_driver, worker_subnav, label, worker_subcats.get(label), current_year)
+
+    try:
+        current_year = datetime.datetime.now().year
+
+        subnav_container = open_fudbal_subnav(driver)
+        if subnav_container is None:
+            logger.error("Exiting.")
+            return
 
+        # Collect subcategory labels
         subcat_labels = []
-        for idx, subcat in enumerate(subcategories):
-            try:
-                label_el = subcat.find_element(
-                    By.CSS_SELECTOR, "div[class*='global-style_nav_item_label__']"
-                )
-                label_text = label_el.get_attribute("textContent").strip()
-                if not label_text:
-                    logging.info(f"Skipping subcat at idx={idx}, label is empty.")
-                    continue
-                if "BONUS TIP" in label_text.upper():
-                    logging.info(f"Skipping bonus subcat: {label_text}")
-                    continue
-
-                subcat_labels.append(label_text)
-                logging.info(f"Added subcat label: {label_text}")
-            except Exception as sub_e:
-                logging.warning(f"Problem reading label from subcat idx={idx}: {sub_e}")
-
-        logging.info(f"Total subcategories: {len(subcat_labels)} => {subcat_labels}")
-
-        # Now iterate over each subcat label
-        for label in subcat_labels:
-            try:
-                logging.info(f"Processing subcategory: {label}")
-                if "ENGLAND 1 (England)" in label or "Košarka special" in label:
-                    logging.info(f"Skipping click for already present subcategory: {label}")
-                # Re-find the subcategory element each loop
-                else:
-                    subcat_xpath = (
-                        f".//div[contains(@class, 'global-style_nav_item_label__') "
-                        f" and normalize-space(text())='{label}']"
-                        "/ancestor::div[contains(@class, 'global-style_nav_item_content__')]"
-                    )
-
-                    subcat_elem = WebDriverWait(subnav_container, 10).until(
-                        EC.presence_of_element_located((By.XPATH, subcat_xpath))
-                    )
-
-                    # Scroll subcat element into center
-                    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", subcat_elem)
-                    time.sleep(0.5)
-
-                    # Optional: Hover using ActionChains
-                    ActionChains(driver).move_to_element(subcat_elem).pause(0.3).perform()
-
-                    # Attempt to click
-                    if not safe_click(driver, subcat_elem, label=label):
-                        logging.warning(f"Skipping subcategory '{label}' - could not click.")
-                        continue
-
-                    time.sleep(2)  # let matches load
-
-                # Scroll multiple times
-                for _ in range(3):
-                    driver.execute_script("window.scrollBy(0, 1200);")
-                    time.sleep(1)
-
-                # Now collect match rows
-                match_rows = driver.find_elements(By.CSS_SELECTOR, "div[class*='global-style_table_row__']")
-                logging.info(f"Found {len(match_rows)} matches under subcategory: {label}")
-
-                # Parse each row
-                for row_el in match_rows:
-                    try:
-                        # Time & date
-                        time_col = row_el.find_element(
-                            By.CSS_SELECTOR, "div[class*='global-style_time_col__']"
-                        )
-                        t_el = time_col.find_element(By.CSS_SELECTOR, "span[class*='global-style_time__']")
-                        d_el = time_col.find_element(By.CSS_SELECTOR, "span[class*='global-style_date__']")
-
-                        t_text = t_el.get_attribute("textContent").strip()
-                        d_text = d_el.get_attribute("textContent").strip()
-
-                        # Teams
-                        home_text = away_text = ""
-                        try:
-                            home_el = row_el.find_element(
-                                By.CSS_SELECTOR, "div[class*='global-style_team_home__']"
-                            )
-                            away_el = row_el.find_element(
-                                By.CSS_SELECTOR, "div[class*='global-style_team_away__']"
-                            )
-                            home_text = home_el.get_attribute("textContent").strip()
-                            away_text = away_el.get_attribute("textContent").strip()
-                        except Exception as e_team:
-                            logging.debug(f"No home/away found for row: {e_team}")
-
-                        # Try parse
-                        dt_combined = None
-                        try:
-                            dt_combined = datetime.datetime.strptime(
-                                f"{d_text} {current_year} {t_text}",
-                                "%d.%m. %Y %H:%M"
-                            )
-                        except ValueError as ve:
-                            logging.warning(f"Date parse error for '{home_text} vs {away_text}': {ve}")
-
-                        # Odds (1, x, 2)
-                        odds_block = row_el.find_elements(
-                            By.CSS_SELECTOR, "div[class*='global-style_market_width_3__']"
-                        )
-                        o1, ox, o2 = "", "", ""
-                        if odds_block:
-                            first_market = odds_block[0]
-                            stake_btns = first_market.find_elements(
-                                By.CSS_SELECTOR,
-                                "button[class*='global-style_stake_type_btn__']"
-                            )
-                            if len(stake_btns) >= 3:
-                                o1 = stake_btns[0].get_attribute("textContent").strip()
-                                ox = stake_btns[1].get_attribute("textContent").strip()
-                                o2 = stake_btns[2].get_attribute("textContent").strip()
-
-                        # Only append if we have a valid parsed date/time
-                        if dt_combined:
-                            match_times.append(dt_combined)
-                            match_dates.append(d_text)
-                            home_teams.append(home_text)
-                            away_teams.append(away_text)
-                            odds_1.append(o1)
-                            odds_x.append(ox)
-                            odds_2.append(o2)
-                        else:
-                            logging.warning(f"Skipping row: no valid date/time for '{home_text} vs {away_text}'.")
-
-                    except Exception as row_ex:
-                        logging.warning(f"Error parsing match row in subcat '{label}': {row_ex}")
-
-                logging.info(f"Done subcategory: {label}")
-
-            except Exception as cat_ex:
-                logging.error(f"Error with subcategory '{label}': {cat_ex}")
+        for label_text, _ in collect_subcats(subnav_container):
+            subcat_labels.append(label_text)
+            logger.debug("Added subcat label: %s", label_text)
+
+        logger.info("Total subcategories: %d => %s", len(subcat_labels), subcat_labels)
+
+        # Subcategories are independent views, so spread them over parallel sessions.
+        # Results are merged in submission order, so the last subcategory listing a
+        # match wins the same way as in a sequential run.
+        with ThreadPoolExecutor(max_workers=MAX_SUBCAT_WORKERS) as executor:
+            futures = {executor.submit(scrape_label, label): label for label in subcat_labels}
+            for future, label in futures.items():
+                try:
+                    for row in future.result():
+                        rows[(row["home"], row["away"], row["time"])] = row
+                except Exception as cat_ex:
+                    logger.error("Error with subcategory '%s': %s", label, cat_ex)
 
         # Build final DataFrame
-        data_dict = {
-            "time": match_times,
-            "date": match_dates,
-            "home": home_teams,
-            "away": away_teams,
-            "1": odds_1,
-            "x": odds_x,
-            "2": odds_2
-        }
-        df = pd.DataFrame(data_dict)
-        df.drop_duplicates(inplace=True)
-        logging.info(f"\nTotal matches collected: {len(df)}")
+        df = pd.DataFrame(list(rows.values()), columns=["time", "date", "home", "away", "1", "x", "2"])
+        logger.info("\nTotal matches collected: %d", len(df))
 
         # Output to logs
-        logging.info("\n--- Extracted Data ---")
+        logger.info("\n--- Extracted Data ---")
         if not df.empty:
-            logging.info(df.head(10).to_string())
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(df.head(10).to_string())
         else:
-            logging.info("No data extracted.")
+            logger.info("No data extracted.")
 
-        # Save to Excel / Pickle
+        # Save to Parquet / Pickle (Excel only on request, openpyxl is by far the slowest writer)
         try:
             os.makedirs("data", exist_ok=True)
-            df.to_excel("data/takmicenjembet.xlsx", index=False)
-            logging.info("Data saved to 'takmicenjembet.xlsx'")
+            df.to_parquet("data/takmicenjembet.parquet", compression="zstd", index=False)
+            logger.info("Data saved to 'takmicenjembet.parquet'")
+            if os.environ.get("EMIT_XLSX"):
+                df.to_excel("data/takmicenjembet.xlsx", index=False)
+                logger.info("Data saved to 'takmicenjembet.xlsx'")
 
             os.makedirs("pickle_data", exist_ok=True)
-            with open("pickle_data/mbetbin.pkl", "wb") as f:
-                pickle.dump(df, f)
-            logging.info("Data saved to 'pickle_data/mbetbin.pkl'")
+            joblib.dump(df, "pickle_data/mbetbin.pkl", compress=3)
+            logger.info("Data saved to 'pickle_data/mbetbin.pkl'")
         except Exception as save_ex:
-            logging.error(f"Error saving data: {save_ex}")
+            logger.error("Error saving data: %s", save_ex)
 
     except Exception as main_ex:
-        logging.error(f"Unexpected error in main logic: {main_ex}")
+        logger.error("Unexpected error in main logic: %s", main_ex)
 
     finally:
-        try:
-            driver.quit()
-            logging.info("Driver closed.")
-        except Exception as close_ex:
-            logging.error(f"Error closing WebDriver: {close_ex}")
+        for d in [driver] + worker_drivers:
+            try:
+                d.quit()
+                logger.info("Driver closed.")
+            except Exception as close_ex:
+                logger.error("Error closing WebDriver: %s", close_ex)
 
 if __name__ == "__main__":
     run()
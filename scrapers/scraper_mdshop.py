@@ -1,31 +1,69 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 import pandas as pd
-import time
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import NoSuchFrameException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import NoSuchFrameException, NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException
 from selenium.webdriver.remote.webelement import WebElement
-import pickle
-from webdriver_manager.chrome import ChromeDriverManager
+import joblib
 from datetime import datetime
 import logging
 import os
 
+from scrapers.driver_cache import create_chrome
+
+logger = logging.getLogger('scraper_mdshop')
+
+
+# Collects every event on the current page in one execute_script call
+# instead of ~10 WebDriver round-trips per app-event.
+EVENTS_JS = """
+const txt = (root, sel) => {
+    const el = root.querySelector(sel);
+    return el ? el.innerText.trim() : null;
+};
+// One pass over the event's odds; markets the event doesn't offer are simply absent
+const markets = ev => {
+    const out = {};
+    for (const el of ev.querySelectorAll('span[data-market]')) {
+        const key = el.getAttribute('data-market');
+        if (!(key in out)) out[key] = el.innerText.trim();
+    }
+    return out;
+};
+return Array.from(document.querySelectorAll('div.selected-league')).flatMap(lg => {
+    const date = txt(lg, '.row.bet-info-wrap>div.col.col1>span');
+    return Array.from(lg.querySelectorAll('app-event')).map(ev => ({
+        date: date,
+        time: txt(ev, 'span.time'),
+        league: txt(ev, '.region-flag-wrap>div.small-text'),
+        home: txt(ev, 'span.home'),
+        away: txt(ev, 'span.away'),
+        markets: markets(ev)
+    }));
+});
+"""
+
+# data-market values of the odds columns that are kept
+MARKET_KEYS = ('1', 'X', '2', 'Manje', 'Vise', 'GG', 'NG')
+
 
 def run():
     # **Configure Logging Inside the Run Function**
     log_dir = 'log'
     os.makedirs(log_dir, exist_ok=True)
-    logging.basicConfig(
-        filename=os.path.join(log_dir, 'scrapermdshop.log'),
-        filemode='w',
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
-
-    logging.info("Starting scraper_mdshop")
+    # Own logger and file handler instead of basicConfig, which only configures the
+    # shared root logger once per process (run.py runs the scrapers side by side)
+    for old_handler in logger.handlers[:]:
+        logger.removeHandler(old_handler)
+        old_handler.close()
+    handler = logging.FileHandler(os.path.join(log_dir, 'scrapermdshop.log'), mode='w')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    logger.propagate = False
+
+    logger.info("Starting scraper_mdshop")
     web = 'https://www.mdshop.ba/sport-prematch?sport=Football'
     options = webdriver.ChromeOptions()
     options.add_argument("--start-maximized")
@@ -35,256 +73,215 @@ def run():
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
+    # Only text is scraped: skip images/fonts/notifications and return from get() at DOMContentLoaded
+    options.page_load_strategy = 'eager'
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.fonts': 2,
+        'profile.default_content_setting_values.notifications': 2,
+    })
 
     try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        logging.info("WebDriver initialized successfully.")
+        driver = create_chrome(options, profile='mdshop')
+        logger.info("WebDriver initialized successfully.")
     except WebDriverException as e:
-        logging.error(f"Error initializing WebDriver: {e}")
+        logger.error("Error initializing WebDriver: %s", e)
         return
 
-    driver.get(web)
-
-    time.sleep(1.1)
+    # The driver holds the mdshop profile lock; quit it however the scrape ends
     try:
-        cookies = driver.find_element(By.CSS_SELECTOR, '.btn.btn-rounded.btn-sm.btn-outline-primary')
-        if cookies:
-            cookies.click()
-    except NoSuchElementException:
-        pass
-    # Da li postoji iframe pop up
-
-    def parse_mdshop_date(date_str):
-        """
-        Parse a date string like "PONEDELJAK, 23. 12. 2024. 04:30"
-        into a Python datetime object.
-        """
+        driver.get(web)
+
         try:
-            # Example input: "PONEDELJAK, 23. 12. 2024. 04:30"
-            # Remove the day of the week (PONEDELJAK, etc.)
-            date_time_part = date_str.split(",")[1].strip()  # "23. 12. 2024. 04:30"
-            # Try parsing with the trailing dot after the year
+            cookies = WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, '.btn.btn-rounded.btn-sm.btn-outline-primary')))
+            cookies.click()
+        except TimeoutException:
+            pass
+        # Da li postoji iframe pop up
+
+        def parse_mdshop_date(date_str):
+            """
+            Parse a date string like "PONEDELJAK, 23. 12. 2024. 04:30"
+            into a Python datetime object.
+            """
             try:
-                return datetime.strptime(date_time_part, "%d. %m. %Y. %H:%M")
-            except ValueError:
-                # If parsing fails, try without the trailing dot
-                return datetime.strptime(date_time_part, "%d. %m. %Y %H:%M")
-        except Exception as e:
-            logging.error(f"Error parsing date '{date_str}': {e}")
-            return None  # Return None if parsing fails
+                # Example input: "PONEDELJAK, 23. 12. 2024. 04:30"
+                # Remove the day of the week (PONEDELJAK, etc.) and split by hand instead of
+                # strptime; the year may or may not carry a trailing dot.
+                day, month, year, hour_minute = date_str.split(",", 1)[1].split()  # "23.", "12.", "2024.", "04:30"
+                hour, minute = hour_minute.split(":")
+                return datetime(int(year.rstrip(".")), int(month.rstrip(".")), int(day.rstrip(".")),
+                                int(hour), int(minute))
+            except Exception as e:
+                logger.error("Error parsing date '%s': %s", date_str, e)
+                return None  # Return None if parsing fails
     
-    def check_exists_frame():
-        try:
-            driver.switch_to.frame("helpcrunch-iframe")
-        except NoSuchFrameException:
-            return False
-
-        try:
-            x_button = driver.find_element(By.ID, 'helpcrunch-popup-close-button')
-            x_button.click()        
-        except NoSuchElementException:
-            return False
-        return True
-
-
-    check_exists_frame()
-
-    date = []
-
-    league = []
-
-    match_time = []
-    match_home = []
-    match_away = []
+        def check_exists_frame():
+            try:
+                driver.switch_to.frame("helpcrunch-iframe")
+            except NoSuchFrameException:
+                return False
 
-    odds_value_1 = []
-    odds_value_x = []
-    odds_value_2 = []
-    less = []
-    more = []
-    no_goals = []
-    goal_goal = []
+            try:
+                x_button = driver.find_element(By.ID, 'helpcrunch-popup-close-button')
+                x_button.click()        
+            except NoSuchElementException:
+                return False
+            return True
 
-    time.sleep(1.1)
 
-    driver.switch_to.default_content()
-    driver.switch_to.frame('sportIframe')
+        check_exists_frame()
 
-    def pull_odds():
+        # One dict per event, keyed by (home, away, time) so repeated events collapse as they arrive
+        rows = {}
 
-        page = driver.find_elements(
-            By.CSS_SELECTOR, "div.selected-league")
+        driver.switch_to.default_content()
+        WebDriverWait(driver, 10).until(EC.frame_to_be_available_and_switch_to_it('sportIframe'))
 
-        for i in page:
-            datetemp = i.find_element(
-                By.CSS_SELECTOR, '.row.bet-info-wrap>div.col.col1>span')
-            matchesandodds = i.find_elements(
-                By.TAG_NAME, 'app-event')
+        def pull_odds():
+            events = driver.execute_script(EVENTS_JS) or []
 
-            for j in matchesandodds:
+            for ev in events:
+                if None in (ev['date'], ev['time'], ev['league'], ev['home'], ev['away']):
+                    logger.warning("Skipping incomplete event: %s", ev)
+                    continue
 
-                timetemp = j.find_element(By.CSS_SELECTOR, 'span.time')
-                leaguetemp = j.find_element(
-                    By.CSS_SELECTOR, '.region-flag-wrap>div.small-text')
-                hometemp = j.find_element(By.CSS_SELECTOR, 'span.home')
-                awaytemp = j.find_element(By.CSS_SELECTOR, 'span.away')
+                # The whole row is built first and stored in one assignment, so a bad event
+                # is dropped entirely instead of leaving a half-filled row behind
                 try:
-                    odds1_temp = j.find_element(
-                        By.CSS_SELECTOR, 'span[data-market="1"]')
-                    odds2_temp = j.find_element(
-                        By.CSS_SELECTOR, 'span[data-market="2"]')
-                    oddsX_temp = j.find_element(
-                        By.CSS_SELECTOR, 'span[data-market="X"]')
-                except NoSuchElementException:
-                    pass
+                    full_date_time_str = ev['date'] + ' ' + ev['time']
+                    parsed_datetime = parse_mdshop_date(full_date_time_str)  # None if parsing fails
+
+                    # Missing markets stay '' instead of blanking the whole row
+                    markets = dict.fromkeys(MARKET_KEYS, '')
+                    markets.update((k, v) for k, v in (ev['markets'] or {}).items() if k in markets)
+
+                    row = {
+                        'leagues': ev['league'],
+                        'time': parsed_datetime,
+                        'home': ev['home'],
+                        'away': ev['away'],
+                        '1': markets['1'],
+                        'x': markets['X'],
+                        '2': markets['2'],
+                        'Manje od 2.5': markets['Manje'],
+                        'Vise od 2.5': markets['Vise'],
+                        'NG': markets['NG'],
+                        'GG': markets['GG']
+                    }
+                except Exception as e:
+                    logger.warning("Skipping event %s vs %s: %s", ev['home'], ev['away'], e)
+                    continue
+
+                rows[(ev['home'], ev['away'], parsed_datetime)] = row
+
+        #time.strptime('00:00', '%H:%M')
+
+        # def date_filter(datetemp:WebElement, timetemp:WebElement):
+        #     if time.strptime(timetemp.text, '%H:%M') == time.strptime('00:00', '%H:%M'):
+        #         date.append(datetemp.text + ' ' + timetemp.text)
+        #     elif len(datetemp) > 1 and time.strptime(timetemp.text, '%H:%M') <= time.strptime('23:59', '%H:%M'):
+        #         date.append(datetemp[0].text + ' ' + timetemp.text)
+        #     else:
+        #         date.append(datetemp.text + ' ' + timetemp.text)
+
+
+        def first_event():
+            """
+            Returns the first event's home-team element and its text, or (None, '') if the page is empty.
+            """
+            events = driver.find_elements(By.CSS_SELECTOR, 'app-event span.home')
+            if not events:
+                return None, ''
+            return events[0], events[0].text
+
+        def wait_for_page_change(old_first, old_text, timeout=10):
+            """
+            Waits until the first event on the page goes stale or shows different text.
+            """
+            if old_first is None:
+                return
+
+            def changed(_):
+                try:
+                    return old_first.text != old_text
                 except StaleElementReferenceException:
-                    pass
+                    return True
+
+            try:
+                WebDriverWait(driver, timeout, poll_frequency=0.2).until(changed)
+            except TimeoutException:
+                logger.warning("Page content did not change after clicking Sledeća.")
+
+        def go_through_pages():
+            try:
+                # Get the total number of pages on the first load
+                # With the eager load strategy the iframe content may still be rendering
+                pages = WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 'ul.pagination>li:last-of-type')))
+                original_page_count = int(pages.text)  # Store the initial page count
+                logger.info("Page count %d", original_page_count)
+            except (TimeoutException, ValueError):
+                logger.error("Pagination element not found or invalid. Stopping.")
+                return  # Exit if pagination is not found or page count is invalid
+
+            # Start by pulling odds from the first page
+            pull_odds()
+
+            # Loop through pages, but stop when reaching the stored page count
+            for i in range(1, original_page_count):  # Start from 1 since the first page is already processed
+                if i >= original_page_count - 1:
+                    logger.info("Reached the last page, stopping.")
+                    break
+
+                # One lookup of the 'Sledeća' (Next) button per page
                 try:
-                    lesstemp = j.find_element(
-                        By.CSS_SELECTOR, 'span[data-market="Manje"]')
-                    moretemp = j.find_element(
-                        By.CSS_SELECTOR, 'span[data-market="Vise"]')
-                    gg_temp = j.find_element(By.CSS_SELECTOR, 'span[data-market="GG"]')
-                    ng_temp = j.find_element(By.CSS_SELECTOR, 'span[data-market="NG"]')
-                except NoSuchElementException:
-                    pass
-                match_home.append(hometemp.text)
-                match_away.append(awaytemp.text)
-                league.append(leaguetemp.text)
-
-                full_date_time_str = datetemp.text + ' ' + timetemp.text
-                parsed_datetime = parse_mdshop_date(full_date_time_str)
-                if parsed_datetime:
-                    date.append(parsed_datetime)  # Append the parsed datetime object
-                else:
-                    date.append("")  # Handle parsing failure gracefully
+                    next_btn = WebDriverWait(driver, 5).until(
+                        EC.element_to_be_clickable((By.XPATH, "//li[normalize-space(text())='Sledeća']")))
+                except TimeoutException:
+                    logger.error("Next button not found, stopping pagination.")
+                    break
+
+                cls = next_btn.get_attribute('class') or ''
+                if 'disabled' in cls or next_btn.get_attribute('aria-disabled') == 'true':
+                    logger.info("Sledeća button is disabled. Stopping pagination.")
+                    break  # Stop pagination if the button is disabled
+
+                old_first, old_text = first_event()
                 try:
-                    odds_value_1.append(odds1_temp.text)
-                    odds_value_2.append(odds2_temp.text)
-                    odds_value_x.append(oddsX_temp.text)
-                    less.append(lesstemp.text)
-                    more.append(moretemp.text)
-                    no_goals.append(ng_temp.text)
-                    goal_goal.append(gg_temp.text)
-                except UnboundLocalError:
-                    odds_value_1.append('')
-                    odds_value_2.append('')
-                    odds_value_x.append('')
-                    less.append('')
-                    more.append('')
-                    no_goals.append('')
-                    goal_goal.append('')
-
-               
-
-    #time.strptime('00:00', '%H:%M')
-
-    # def date_filter(datetemp:WebElement, timetemp:WebElement):
-    #     if time.strptime(timetemp.text, '%H:%M') == time.strptime('00:00', '%H:%M'):
-    #         date.append(datetemp.text + ' ' + timetemp.text)
-    #     elif len(datetemp) > 1 and time.strptime(timetemp.text, '%H:%M') <= time.strptime('23:59', '%H:%M'):
-    #         date.append(datetemp[0].text + ' ' + timetemp.text)
-    #     else:
-    #         date.append(datetemp.text + ' ' + timetemp.text)
-
-
-    def go_through_pages():
-        try:
-            # Get the total number of pages on the first load
-            pages = driver.find_element(By.CSS_SELECTOR, 'ul.pagination>li:last-of-type')
-            original_page_count = int(pages.text)  # Store the initial page count
-            logging.info(f"Page count {original_page_count}")
-        except (NoSuchElementException, ValueError):
-            logging.error("Pagination element not found or invalid. Stopping.")
-            return  # Exit if pagination is not found or page count is invalid
+                    driver.execute_script("arguments[0].click();", next_btn)  # Click using JS to avoid interaction issues
+                except StaleElementReferenceException:
+                    logger.info("Stale reference, retrying click.")
+                    next_btn = driver.find_element(By.XPATH, "//li[normalize-space(text())='Sledeća']")
+                    driver.execute_script("arguments[0].click();", next_btn)
+                wait_for_page_change(old_first, old_text)  # Wait for the next page to load
+                pull_odds()  # Pull odds from the next page
 
-        # Start by pulling odds from the first page
-        pull_odds()
+                # Stop when the current page index reaches the original page count
 
-        # Loop through pages, but stop when reaching the stored page count
-        for i in range(1, original_page_count):  # Start from 1 since the first page is already processed
-            time.sleep(0.4)  # Allow some time before interacting with the next page
+        go_through_pages()
+    finally:
+        driver.quit()
+        logger.info("WebDriver closed.")
 
-            try:
-                # Find all the pagination buttons
-                buttons = driver.find_elements(By.CSS_SELECTOR, 'ul.pagination>li')
-
-                # Iterate over the buttons to find the 'Sledeća' (Next) button
-                for button in buttons:
-                    # Wait for the 'Sledeća' button to be clickable
-                    button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//li[text()='Sledeća']")))
-                    if 'disabled' in button.get_attribute('class') or button.get_attribute('aria-disabled') == 'true':
-                        logging.info("Sledeća button is disabled. Stopping pagination.")
-
-                        break  # Stop pagination if the button is disabled
-                    
-                    if button.text == 'Sledeća':  # Click the 'Next' button if found
-                        if i >= original_page_count - 1:
-                            logging.info("Reached the last page, stopping.")
-                            break
-                        try:
-                            driver.execute_script("arguments[0].click();", button)  # Click using JS to avoid interaction issues
-                            time.sleep(0.4)  # Allow time for the next page to load
-                            pull_odds()  # Pull odds from the next page
-                        except StaleElementReferenceException:
-                            logging.info("Stale reference, retrying click.")
-                            driver.execute_script("arguments[0].click();", button)
-                            time.sleep(0.8)  # Allow time for the next page to load
-                            pull_odds()  # Retry pulling odds
 
-            except NoSuchElementException:
-                logging.error("Next button not found, stopping pagination.")
-                break  # Exit the loop if the 'Next' button is not found
-            
-            # Stop when the current page index reaches the original page count
-
-    go_through_pages()
-
-
-    # print(
-    #     'league:' +str(len(league))  +'\n'+
-    #     'time:' +str(len(match_time)) +'\n'+
-    #     'home:' +str(len(match_home)) +'\n'+
-    #     'away:' +str(len(match_away)) +'\n'+
-    #     '1:' +str(len(odds_value_1)) +'\n'+
-    #     'x:' +str(len(odds_value_x)) +'\n'+
-    #     '2:' +str(len(odds_value_2)) +'\n'+
-    #     'Manje:' +str(len(less)) +'\n'+
-    #     'Vise:' +str(len(more)) +'\n'+
-    #     'NG:' +str(len(no_goals)) +'\n'+
-    #     'GG:' +str(len(goal_goal)) +'\n'
-    # )
-
-    xy = {
-        'leagues': league,
-        'time': date,
-        'home': match_home,
-        'away': match_away,
-        '1': odds_value_1,
-        'x': odds_value_x,
-        '2': odds_value_2,
-        'Manje od 2.5': less,
-        'Vise od 2.5': more,
-        'NG': no_goals,
-        'GG': goal_goal
-    }
-    array_length = len(set(map(len, xy.values())))
-    if array_length > 1:
-        # Assign default values to arrays that don't have the same length
-        max_length = max(map(len, xy.values()))
-        for key, value in xy.items():
-            if isinstance(value, str):
-                xy[key] = list(value)
-            if len(value) < max_length:
-                xy[key].extend([''] * (max_length - len(value)))
-
-    df = pd.DataFrame.from_dict(xy)
+    df = pd.DataFrame(list(rows.values()), columns=[
+        'leagues', 'time', 'home', 'away', '1', 'x', '2', 'Manje od 2.5', 'Vise od 2.5', 'NG', 'GG'])
     # print(df)
+    # Parquet needs one type per column; an unparsed date (None) becomes NaT
+    df['time'] = pd.to_datetime(df['time'], errors='coerce')
 
-    # driver.quit()
-    df.to_excel('data/takmicenjemdshop.xlsx')
-    output = open('pickle_data/takmicenjeadmiralbin.pkl', 'wb')
-    pickle.dump(df, output)
-    output.close()
-
-run()
\ No newline at end of file
+    # Parquet replaces the (slow) Excel export; set EMIT_XLSX to still get the .xlsx
+    os.makedirs('data', exist_ok=True)
+    try:
+        df.to_parquet('data/takmicenjemdshop.parquet', compression='zstd', index=False)
+    except Exception as e:
+        logger.error("Error saving parquet: %s", e)
+    if os.environ.get('EMIT_XLSX'):
+        df.to_excel('data/takmicenjemdshop.xlsx')
+    # Compressed joblib dump; the surebet loaders read it with joblib.load
+    joblib.dump(df, 'pickle_data/takmicenjeadmiralbin.pkl', compress=3)
+
+if __name__ == "__main__":
+    run()
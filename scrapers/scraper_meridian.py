@@ -1,9 +1,11 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import logging
 import os
-import time
-import pickle
 import pandas as pd
-from selenium import webdriver
+import queue
+from parsel import Selector
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -15,24 +17,23 @@ from selenium.common.exceptions import (
     ElementClickInterceptedException,
     ElementNotInteractableException
 )
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import datetime
 
+from scrapers.driver_pool import ACQUIRE_TIMEOUT, DRIVER_POOL
+from scrapers.storage import is_unchanged, page_hash, store_hash, write_parquet_atomic
+
 # ---------------------------- Configuration ---------------------------- #
 
-# Configure logging
+# Logging is configured at the start of run()
 LOG_DIR = 'log'
-os.makedirs(LOG_DIR, exist_ok=True)
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, 'scraper_meridianbet.log'),
-    filemode='w',
-    level=logging.INFO,  # Adjust to WARNING or ERROR to reduce verbosity
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = logging.getLogger('scraper_meridian')
+
+PARQUET_PATH = "pickle_data/meridianbet_fudbal.parquet"
+HASH_PATH = "pickle_data/meridianbet_fudbal.hash"
 
 # ---------------------------- Helper Functions ---------------------------- #
 
+@functools.lru_cache(maxsize=4096)
 def map_odds_title(title, home_team, away_team):
     """
     Maps the title attribute to standardized keys.
@@ -40,6 +41,7 @@ def map_odds_title(title, home_team, away_team):
     - Draw: 'X'
     - Away win: '2'
     - Other bet types are returned as is.
+    Memoized: the same market titles recur for every match.
     """
     if home_team in title and "pobeđuje na meču" in title:
         return '1'
@@ -64,78 +66,87 @@ def parse_teams(home_str, away_str):
         away = away_str.strip()
         return home, away
     except Exception as e:
-        logging.error(f"Error parsing teams: {e}")
+        logger.error("Error parsing teams: %s", e)
         return "N/A", "N/A"
 
-def parse_kickoff(time_str, date_str):
+def parse_kickoffs(raw_times):
     """
-    Combine time and date strings to create a datetime object.
+    Combine (time, date) string pairs into datetimes in one vectorized pass.
     Expected formats:
         time_str: "15:30"
         date_str: "29.12"
     Assumes the current year if the year is not provided.
+    Returns a DatetimeIndex; pairs that cannot be parsed become NaT.
     """
-    try:
-        # Check if date_str includes year
-        if len(date_str.split('.')) == 2:
-            # Append current year
-            current_year = datetime.datetime.now().year
-            date_str += f".{current_year}"
-        # Combine date and time
-        date_time_combined = f"{date_str} {time_str}"
-        # Parse to datetime object
-        match_dt = datetime.datetime.strptime(date_time_combined, "%d.%m.%Y %H:%M")
-        return match_dt
-    except Exception as e:
-        logging.error(f"Error parsing kickoff information '{time_str} {date_str}': {e}")
-        return "N/A"
+    current_year = datetime.datetime.now().year
+    combined = [
+        # Append current year if date_str does not include one
+        f"{date_str}.{current_year} {time_str}" if len(date_str.split('.')) == 2 else f"{date_str} {time_str}"
+        for time_str, date_str in raw_times
+    ]
+    kickoffs = pd.to_datetime(combined, format="%d.%m.%Y %H:%M", errors="coerce", cache=True)
+    if kickoffs.isna().any():
+        bad = [c for c, k in zip(combined, kickoffs.isna()) if k]
+        logger.error("Error parsing kickoff information for %s matches, e.g. %s", len(bad), bad[:3])
+    return kickoffs
+
+def _text(sel, css):
+    """
+    Returns the stripped text content of the first element matching css under sel, or None.
+    """
+    found = sel.css(css)
+    if not found:
+        return None
+    return found[0].xpath("normalize-space(string())").get()
 
-def scrape_matches(driver):
+def scrape_matches(driver, page_source=None):
     """
     Scrapes the match data from the page using updated CSS selectors.
     Returns a list of dictionaries, each representing a match.
+
+    The rendered page is read once (page_source, unless already given) and parsed
+    with parsel, instead of ~7 WebDriver round-trips per match.
     """
     matches_data = []
+    raw_times = []  # (time, date) per entry of matches_data
     try:
         # Corrected Selector: Locate all divs with class 'c-event' inside 'standard-event' components
-        match_elements = WebDriverWait(driver, 15).until(
+        WebDriverWait(driver, 15).until(
             EC.presence_of_all_elements_located(
                 (By.CSS_SELECTOR, "standard-event div.c-event")
             )
         )
-        logging.info(f"Found {len(match_elements)} match elements.")
+        page = Selector(text=page_source or driver.page_source)
+        match_elements = page.css("standard-event div.c-event")
+        logger.info("Found %s match elements.", len(match_elements))
 
         for match in match_elements:
             try:
                 # Extract kickoff time and date
-                time_element = match.find_element(By.CSS_SELECTOR, "div.c-event__period-time")
-                date_element = match.find_element(By.CSS_SELECTOR, "div.c-event__period-min")
-                time_str = time_element.text.strip()
-                date_str = date_element.text.strip()
+                time_str = _text(match, "div.c-event__period-time")
+                date_str = _text(match, "div.c-event__period-min")
 
                 # Extract home and away team names
-                home_element = match.find_element(By.CSS_SELECTOR, "div.c-event__rivals--home > span")
-                away_element = match.find_element(By.CSS_SELECTOR, "div.c-event__rivals--away > span")
-                home_str = home_element.text.strip()
-                away_str = away_element.text.strip()
+                home_str = _text(match, "div.c-event__rivals--home > span")
+                away_str = _text(match, "div.c-event__rivals--away > span")
+                if None in (time_str, date_str, home_str, away_str):
+                    raise NoSuchElementException("kickoff or team element missing")
 
-                # Parse teams and kickoff
+                # Parse teams; kickoffs are parsed for all matches at once below
                 home_team, away_team = parse_teams(home_str, away_str)
-                match_datetime = parse_kickoff(time_str, date_str)
 
                 # Extract odds
-                odds_elements = match.find_elements(By.CSS_SELECTOR, "div.c-selection")
                 odds = {}
-                for odd in odds_elements:
-                    title = odd.get_attribute('title').strip()
-                    value = odd.text.strip()
+                for odd in match.css("div.c-selection"):
+                    title = (odd.attrib.get('title') or '').strip()
+                    value = odd.xpath("normalize-space(string())").get()
                     mapped_key = map_odds_title(title, home_team, away_team)
                     odds[mapped_key] = value
 
                 match_info = {
                     "home": home_team,
                     "away": away_team,
-                    "time": match_datetime,
+                    "time": None,  # filled in after the loop by parse_kickoffs
                 }
 
                 # Add odds to match_info
@@ -143,18 +154,22 @@ def scrape_matches(driver):
                     match_info[key] = val
 
                 matches_data.append(match_info)
+                raw_times.append((time_str, date_str))
             except NoSuchElementException as ex_row:
-                logging.error(f"NoSuchElementException parsing a match: {ex_row}")
+                logger.error("NoSuchElementException parsing a match: %s", ex_row)
                 continue
             except Exception as ex_row:
-                logging.error(f"Error parsing a match: {ex_row}")
+                logger.error("Error parsing a match: %s", ex_row)
                 continue
+
+        for match_info, kickoff in zip(matches_data, parse_kickoffs(raw_times)):
+            match_info["time"] = kickoff
     except TimeoutException:
-        logging.error("Match elements not found within the given time.")
+        logger.error("Match elements not found within the given time.")
     except NoSuchElementException:
-        logging.error("No matches found on the page.")
+        logger.error("No matches found on the page.")
     except Exception as e:
-        logging.error(f"Unexpected error in scrape_matches: {e}")
+        logger.error("Unexpected error in scrape_matches: %s", e)
     return matches_data
 
 def safe_click(driver, element, label="(unknown)"):
@@ -168,39 +183,42 @@ def safe_click(driver, element, label="(unknown)"):
     try:
         # Scroll the element into view
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        # Wait briefly to ensure it's scrolled
-        time.sleep(0.5)
+        # Wait until it's actually visible after the scroll
+        try:
+            WebDriverWait(driver, 2).until(EC.visibility_of(element))
+        except TimeoutException:
+            pass
 
         # Attempt regular click
         element.click()
-        logging.info(f"Successfully clicked on {label} using regular click.")
+        logger.debug("Successfully clicked on %s using regular click.", label)
         return True
     except (ElementClickInterceptedException, ElementNotInteractableException) as e:
-        logging.warning(f"{e.__class__.__name__} on {label}: {e}. Trying ActionChains click.")
+        logger.warning("%s on %s: %s. Trying ActionChains click.", e.__class__.__name__, label, e)
         try:
             actions = ActionChains(driver)
             actions.move_to_element(element).click().perform()
-            logging.info(f"Successfully clicked on {label} using ActionChains.")
+            logger.info("Successfully clicked on %s using ActionChains.", label)
             return True
         except Exception as e_act:
-            logging.warning(f"ActionChains click failed for {label}: {e_act}. Trying JS click.")
+            logger.warning("ActionChains click failed for %s: %s. Trying JS click.", label, e_act)
             try:
                 driver.execute_script("arguments[0].click();", element)
-                logging.info(f"Successfully clicked on {label} using JS click.")
+                logger.info("Successfully clicked on %s using JS click.", label)
                 return True
             except Exception as e_js:
-                logging.warning(f"JS click also failed for {label}: {e_js}")
-                logging.error(f"Failed to click on {label}.")
+                logger.warning("JS click also failed for %s: %s", label, e_js)
+                logger.error("Failed to click on %s.", label)
                 return False
     except Exception as e:
-        logging.warning(f"Unexpected exception when clicking on {label}: {e}. Trying JS click.")
+        logger.warning("Unexpected exception when clicking on %s: %s. Trying JS click.", label, e)
         try:
             driver.execute_script("arguments[0].click();", element)
-            logging.info(f"Successfully clicked on {label} using JS click.")
+            logger.info("Successfully clicked on %s using JS click.", label)
             return True
         except Exception as e_js:
-            logging.warning(f"JS click failed for {label}: {e_js}")
-            logging.error(f"Failed to click on {label}.")
+            logger.warning("JS click failed for %s: %s", label, e_js)
+            logger.error("Failed to click on %s.", label)
             return False
 
 def close_initial_overlay(driver):
@@ -215,13 +233,13 @@ def close_initial_overlay(driver):
             )
         )
         if safe_click(driver, overlay, label="Initial Overlay Close Button"):
-            logging.info("Closed the initial overlay successfully.")
+            logger.info("Closed the initial overlay successfully.")
         else:
-            logging.error("Failed to close the initial overlay.")
+            logger.error("Failed to close the initial overlay.")
     except TimeoutException:
-        logging.warning("Initial overlay not found; it might have already been closed.")
+        logger.warning("Initial overlay not found; it might have already been closed.")
     except Exception as e:
-        logging.error(f"Error while attempting to close the initial overlay: {e}")
+        logger.error("Error while attempting to close the initial overlay: %s", e)
 
 def click_sve_button(driver):
     """
@@ -235,8 +253,7 @@ def click_sve_button(driver):
             )
         )
         if safe_click(driver, sve_button, label="'Sve' Button"):
-            logging.info("Clicked on 'Sve' button successfully.")
-            time.sleep(2)  # Wait for the content to load after clicking
+            logger.info("Clicked on 'Sve' button successfully.")
 
             # Additional verification: Check if matches are loaded
             try:
@@ -246,20 +263,22 @@ def click_sve_button(driver):
                         (By.CSS_SELECTOR, "standard-event div.c-event")
                     )
                 )
-                logging.info("'Sve' button click resulted in matches being loaded.")
+                logger.info("'Sve' button click resulted in matches being loaded.")
             except TimeoutException:
-                logging.error("After clicking 'Sve', match elements were not loaded.")
+                logger.error("After clicking 'Sve', match elements were not loaded.")
         else:
-            logging.error("Failed to click on 'Sve' button.")
+            logger.error("Failed to click on 'Sve' button.")
     except TimeoutException:
-        logging.error("'Sve' button not found within the given time.")
+        logger.error("'Sve' button not found within the given time.")
     except Exception as e:
-        logging.error(f"Error clicking on 'Sve' button: {e}")
+        logger.error("Error clicking on 'Sve' button: %s", e)
 
 def scroll_to_load_all(driver):
     """
     Scrolls the correct container to ensure all dynamic content is loaded.
-    Implements smooth scrolling in smaller increments.
+    Steps one viewport at a time in an async script that yields to the browser
+    between steps, so every event is rendered in view, and stops once the
+    container height has not grown for two waits at the bottom.
     """
     try:
         # Identify the correct scroller based on the provided HTML
@@ -268,31 +287,46 @@ def scroll_to_load_all(driver):
                 (By.CSS_SELECTOR, "div.l-betting-page")
             )
         )
-        last_height = driver.execute_script("return arguments[0].scrollHeight", scroller)
-        current_position = 0
-        scroll_increment = 300  # Pixels to scroll each step
-        pause_time = 0.3  # Pause between scrolls
-
-        while current_position < last_height:
-            # Scroll down by the increment
-            driver.execute_script(
-                "arguments[0].scrollTo(arguments[0].scrollTop + arguments[1], arguments[0].scrollTop + arguments[1]);",
-                scroller,
-                scroll_increment
+        stable = 0
+        while stable < 2:
+            # Scroll down one viewport at a time until the bottom is reached, pausing
+            # 50 ms between steps so the page can render and load what came into view;
+            # gives up after 20 s (within the script timeout) and reports the height
+            last_height = driver.execute_async_script(
+                """
+                const el = arguments[0];
+                const done = arguments[arguments.length - 1];
+                const step = Math.max(el.clientHeight, 300);
+                const deadline = Date.now() + 20000;
+                const tick = () => {
+                    const before = el.scrollTop;
+                    el.scrollTop = before + step;
+                    if (el.scrollTop === before || el.scrollTop + el.clientHeight >= el.scrollHeight
+                            || Date.now() > deadline) {
+                        done(el.scrollHeight);
+                    } else {
+                        setTimeout(tick, 50);
+                    }
+                };
+                tick();
+                """,
+                scroller
             )
-            current_position += scroll_increment
-            logging.info(f"Scrolled to position {current_position} / {last_height}")
-            time.sleep(pause_time)
-            # Update scroll_height in case new content was loaded
-            new_scroll_height = driver.execute_script("return arguments[0].scrollHeight", scroller)
-            if new_scroll_height > last_height:
-                last_height = new_scroll_height
-
-        logging.info("Completed smooth scrolling.")
+            logger.debug("Scrolled to bottom at height %s", last_height)
+            # Wait for more content to be appended below
+            try:
+                WebDriverWait(driver, 2).until(
+                    lambda d: d.execute_script("return arguments[0].scrollHeight", scroller) > last_height
+                )
+                stable = 0
+            except TimeoutException:
+                stable += 1
+
+        logger.info("Completed scrolling.")
     except TimeoutException:
-        logging.error("Scroller container not found within the given time.")
+        logger.error("Scroller container not found within the given time.")
     except Exception as e:
-        logging.error(f"Error during scrolling: {e}")
+        logger.error("Error during scrolling: %s", e)
 
 def close_overlays(driver):
     """
@@ -304,12 +338,16 @@ def close_overlays(driver):
         for button in consent_buttons:
             try:
                 button.click()
-                logging.info("Closed an overlay by clicking on consent button.")
-                time.sleep(1)  # Wait briefly after closing
+                logger.info("Closed an overlay by clicking on consent button.")
+                # Wait for the overlay to go away instead of a fixed pause
+                try:
+                    WebDriverWait(driver, 1).until(EC.invisibility_of_element(button))
+                except TimeoutException:
+                    pass
             except Exception as e:
-                logging.warning(f"Failed to click on consent button: {e}")
+                logger.warning("Failed to click on consent button: %s", e)
     except Exception as e:
-        logging.error(f"Error while trying to close overlays: {e}")
+        logger.error("Error while trying to close overlays: %s", e)
 
 # ---------------------------- Main Scraper Function ---------------------------- #
 
@@ -317,42 +355,41 @@ def run():
     """
     Main function to execute the scraping process.
     """
+    os.makedirs(LOG_DIR, exist_ok=True)
+    # Own logger and file handler instead of basicConfig, which only configures the
+    # shared root logger once per process; WARNING by default, LOG_LEVEL=INFO/DEBUG for detail
+    for old_handler in logger.handlers[:]:
+        logger.removeHandler(old_handler)
+        old_handler.close()
+    handler = logging.FileHandler(os.path.join(LOG_DIR, 'scraper_meridianbet.log'), mode='w')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING').upper())
+    logger.propagate = False
+
     url = "https://meridianbet.ba/sr/kladjenje/fudbal"
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")  # Run in headless mode; comment out for debugging
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-
-    # Optionally, set a custom User-Agent to mimic real browser behavior
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36"
-    )
-
-    # Initialize WebDriver
+
+    # Take an already started Chrome from the shared pool
     try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), 
-            options=options
-        )
-        logging.info("WebDriver initialized successfully.")
+        driver = DRIVER_POOL.acquire(timeout=ACQUIRE_TIMEOUT)
+        logger.info("WebDriver acquired successfully.")
+    except queue.Empty:
+        logger.error("No pooled WebDriver became free within %ss.", ACQUIRE_TIMEOUT)
+        return
     except WebDriverException as e:
-        logging.error(f"Error initializing WebDriver: {e}")
+        logger.error("Error initializing WebDriver: %s", e)
         return
 
     # Navigate to the target URL
     try:
         driver.get(url)
-        logging.info(f"Navigated to {url}")
+        logger.info("Navigated to %s", url)
         close_overlays(driver)  # Close any additional pop-ups or overlays
         close_initial_overlay(driver)  # Close the specific initial overlay
-        logging.info("Page loaded and initial overlays are closed.")
+        logger.info("Page loaded and initial overlays are closed.")
     except Exception as e:
-        logging.error(f"Error navigating to {url}: {e}")
-        driver.quit()
+        logger.error("Error navigating to %s: %s", url, e)
+        DRIVER_POOL.release(driver)
         return
 
     all_matches = []
@@ -363,22 +400,32 @@ def run():
     # 2) Scroll to load all dynamic content
     scroll_to_load_all(driver)
 
-    # 3) Scrape the match data
+    # 3) Skip parsing and saving if the page is identical to the last saved run
     try:
-        matches = scrape_matches(driver)
-        logging.info(f"Scraped a total of {len(matches)} matches.")
-        all_matches.extend(matches)
-    except Exception as e:
-        logging.error(f"Error during match scraping: {e}")
+        page_source = driver.page_source
+    except WebDriverException as e:
+        logger.error("Error reading page source: %s", e)
+        page_source = None
+    digest = page_hash(page_source) if page_source else None
+    if digest and is_unchanged(HASH_PATH, digest, PARQUET_PATH):
+        logger.info("Page unchanged since the last run, skipping.")
+        DRIVER_POOL.release(driver)
+        return
 
-    # 4) Close the WebDriver
+    # 4) Scrape the match data
     try:
-        driver.quit()
-        logging.info("WebDriver closed successfully.")
+        matches = scrape_matches(driver, page_source)
+        logger.info("Scraped a total of %s matches.", len(matches))
+        all_matches.extend(matches)
     except Exception as e:
-        logging.error(f"Error closing WebDriver: {e}")
+        logger.error("Error during match scraping: %s", e)
 
-    # 5) Save the scraped data
+    # 5) Hand the WebDriver back to the pool in the background; resetting it
+    # overlaps with building and writing the DataFrame below
+    io_pool = ThreadPoolExecutor(max_workers=2)
+    io_pool.submit(DRIVER_POOL.release, driver)
+
+    # 6) Save the scraped data
     if all_matches:
         try:
             # Identify all unique columns excluding 'home', 'away', and 'kickoff'
@@ -393,24 +440,46 @@ def run():
             # Create DataFrame
             df = pd.DataFrame(all_matches, columns=columns)
             
-            logging.info(f"DataFrame created with {len(df)} rows and columns: {df.columns.tolist()}.")
-
-            # Save to Excel
-            os.makedirs("data", exist_ok=True)
-            excel_path = "data/meridianbet_fudbal.xlsx"
-            df.to_excel(excel_path, index=False)
-            logging.info(f"Data saved to {excel_path}")
-
-            # Save to Pickle
-            os.makedirs("pickle_data", exist_ok=True)
-            pickle_path = "pickle_data/meridianbet_fudbal.pkl"
-            with open(pickle_path, "wb") as f:
-                pickle.dump(df, f)
-            logging.info(f"Data pickled to {pickle_path}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("DataFrame created with %s rows and columns: %s.", len(df), df.columns.tolist())
+
+            # Parquet needs one type per column; anything that is not a datetime becomes NaT,
+            # which is what the surebet loaders coerce it to anyway
+            df["time"] = pd.to_datetime(df["time"], errors="coerce")
+
+            # Excel only on request, openpyxl is by far the slowest writer;
+            # written alongside the Parquet file
+            excel_future = None
+            if os.environ.get("EMIT_XLSX"):
+                os.makedirs("data", exist_ok=True)
+                excel_path = "data/meridianbet_fudbal.xlsx"
+                excel_future = io_pool.submit(df.to_excel, excel_path, index=False)
+
+            # Save to Parquet (atomic, read by the surebet loaders from pickle_data)
+            write_parquet_atomic(df, PARQUET_PATH)
+            logger.info("Data saved to %s", PARQUET_PATH)
+            if digest:
+                store_hash(HASH_PATH, digest)
+
+            if excel_future is not None:
+                excel_future.result()
+                logger.info("Data saved to %s", excel_path)
         except Exception as e:
-            logging.error(f"Error saving data: {e}")
+            logger.error("Error saving data: %s", e)
     else:
-        logging.info("No matches were scraped.")
+        logger.info("No matches were scraped.")
+
+    # Wait for the driver reset (and any pending write) before returning
+    io_pool.shutdown(wait=True)
+    logger.info("WebDriver released to the pool.")
+
+async def run_async():
+    """
+    Runs the blocking Selenium scrape in the default executor, so it can be
+    awaited alongside other scrapers on one event loop.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, run)
 
 if __name__ == "__main__":
-    run()
+    asyncio.run(run_async())
@@ -1,59 +1,101 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import glob
 import os
-import pickle
 import pandas as pd
-import time
-from selenium import webdriver
+import queue
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from datetime import datetime, timedelta
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from datetime import datetime
 import logging
 import os
 
+from scrapers.driver_pool import ACQUIRE_TIMEOUT, DRIVER_POOL
+from scrapers.storage import is_unchanged, page_hash, store_hash, write_parquet_atomic
 
-def run():
-        # **Configure Logging Inside the Run Function**
-    log_dir = 'log'
-    os.makedirs(log_dir, exist_ok=True)
-    logging.basicConfig(
-        filename=os.path.join(log_dir, 'scrapermozza.log'),
-        filemode='w',
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
-
-    logging.info("Starting scraper_mozza")
-    web = 'https://mozzartbet.ba/en#/date/three_days'
-    options = webdriver.ChromeOptions()
-    options.add_argument("--disable-gpu")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--start-maximized")
-    options.add_argument(f"--user-data-dir=/tmp/chrome_{os.getpid()}")
-    # Uncomment the following line to run in headless mode
-    options.add_argument("--headless")
-    # To prevent detection, you can add more options
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
+LOG_DIR = 'log'
+logger = logging.getLogger('scraper_mozza')
 
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        logging.info("WebDriver initialized successfully.")
-    except WebDriverException as e:
-        logging.error(f"Error initializing WebDriver: {e}")
-        return
+PARQUET_PATH = 'pickle_data/takmicenjemozzabin.parquet'
+HASH_PATH = 'pickle_data/takmicenjemozzabin.hash'
+
+MAX_SCROLLS = 40
+
+# We’ll handle these recognized day words; value is datetime.weekday()
+WEEKDAY_IDX = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+PAGE_HEIGHT_JS = "return document.body.scrollHeight"
+SCROLL_TO_FOOTER_JS = (
+    "document.getElementsByClassName('footer-logo')[0].scrollIntoView("
+    "true,{behavior: 'smooth', block: 'end', inline: 'nearest'})"
+)
+
+# Reads league, teams, kickoff and the first three odds of every match in one
+# round-trip; innerText keeps the line breaks WebElement.text would return.
+COMPETITIONS_JS = """
+const txt = (root, sel) => {
+    const el = root.querySelector(sel);
+    return el ? el.innerText : null;
+};
+return Array.from(document.querySelectorAll('.competition article')).map(a => ({
+    league: txt(a, '.infos .leagueName'),
+    pairs: txt(a, '.part1 .pairs'),
+    time: txt(a, '.part1 .time'),
+    odds: Array.from(a.querySelectorAll('div.part2>div.part2wrapper >div.partvar.odds'))
+        .slice(0, 3).map(o => o.innerText)
+}));
+"""
+
+
+def parse_kickoffs(time_raw, now):
+    """
+    Parses kickoff texts like "Mon 18:30", "Today 20:00" or "Sutra 18:00" for
+    a whole column at once. Returns a datetime64 Series; unknown formats are NaT.
+    """
+    parts = time_raw.str.split()
+    # string dtype keeps the .str accessor usable when no text splits (all NaN)
+    day_text = parts.str[0].astype("string")
+    lower = day_text.str.lower()
 
+    # Days ahead of today: weekday names (English, as listed), plus today/tomorrow words
+    current_weekday = now.weekday()
+    offsets = {day: (idx - current_weekday) % 7 for day, idx in WEEKDAY_IDX.items()}
+    days_ahead = day_text.map(offsets)
+    days_ahead = days_ahead.mask(lower.isin(["danas", "today"]), 0)
+    days_ahead = days_ahead.mask(lower.isin(["sutra", "tomorrow"]), 1)
+    days_ahead = days_ahead.where(parts.str.len() >= 2)  # expect e.g. "Mon" + "18:30"
+
+    clock = pd.to_datetime(parts.str[-1], format="%H:%M", errors="coerce")
+    kickoff = (pd.Timestamp(now.date())
+               + pd.to_timedelta(days_ahead, unit="D")
+               + (clock - clock.dt.normalize()))
+
+    unparsed = time_raw[kickoff.isna()]
+    if not unparsed.empty:
+        logger.error("Could not parse %s kickoff texts, e.g. %s", len(unparsed), unparsed.head(3).tolist())
+    return kickoff
+
+
+def scrape(driver):
+    """
+    Loads the three-day football offer on the given driver and returns
+    (rows, page digest, read time): one dict per match, with the kickoff still
+    as raw text ('time_raw'), and the moment the matches were read, which
+    "Today"/weekday names are relative to. rows is None when the page is
+    unchanged since the last saved run.
+    """
+    web = 'https://mozzartbet.ba/en#/date/three_days'
     driver.get(web)
-    time.sleep(0.8)
-    
-    # Close "OneSignal" popup
-    accept = driver.find_element("id", "onesignal-slidedown-cancel-button")
+
+    # Close "OneSignal" popup as soon as it can be clicked
+    accept = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.ID, "onesignal-slidedown-cancel-button")))
     accept.click()
 
     # Accept GDPR
-    accept2 = driver.find_element(By.CSS_SELECTOR, "#gdpr-wrapper-new .gdpr-content .accept-button")
+    accept2 = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "#gdpr-wrapper-new .gdpr-content .accept-button")))
     accept2.click()
 
     # Scroll & "Load more" setup
@@ -65,104 +107,45 @@ def run():
     football = driver.find_element(By.XPATH, "//span[text()='Football']")
     football.click()
 
-    # Scroll multiple times
-    for let in range(40):
-        driver.execute_script(
-            "document.getElementsByClassName('footer-logo')[0].scrollIntoView("
-            "true,{behavior: 'smooth', block: 'end', inline: 'nearest'})"
-        )
-        time.sleep(0.3)
+    # Scroll until the page height stays the same for two scrolls in a row
+    # (capped at the old fixed count of 40)
+    stable = 0
+    for _ in range(MAX_SCROLLS):
+        prev_height = driver.execute_script(PAGE_HEIGHT_JS)
+        driver.execute_script(SCROLL_TO_FOOTER_JS)
+        try:
+            WebDriverWait(driver, 2).until(lambda d: d.execute_script(PAGE_HEIGHT_JS) > prev_height)
+            stable = 0
+        except TimeoutException:
+            stable += 1
+            if stable >= 2:
+                break
     # Try to click "Load more"
     try:
         load_more.click()
     except:
         pass
 
-    # Prepare lists
-    league_name = []
-    match_datetime_list = []   # We'll store actual Python datetime objects
-    match_home = []
-    match_away = []
-    odds_value_1 = []
-    odds_value_x = []
-    odds_value_2 = []
-
-    # We’ll handle these recognized day words
-    weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    # Optionally, you could also handle local language e.g. "Pon", "Uto", etc.
-    # or "Danas", "Sutra".
-
-    def parse_date(date_str):
-        """
-        Expects something like "Mon 18:30" or "Danas 20:00", etc.
-        Splits on space. If the first part is known day_text or "Danas"/"Sutra", 
-        we find the date. Then parse HH:MM.
-        Returns a datetime object or None if parsing fails.
-        """
-        today = datetime.now()
-
-        # If there's no space, or something unexpected, handle it
-        parts = date_str.strip().split()
-        if len(parts) < 2:
-            # We expect at least 2 parts, e.g. "Mon" + "18:30"
-            return None
-        
-        day_text = parts[0]
-        time_text = parts[-1]  # e.g. "18:30"
-        
-        # 1) Figure out the date
-        if day_text.lower() in ["danas", "today"]:
-            match_date = today.date()
-        elif day_text.lower() in ["sutra", "tomorrow"]:
-            match_date = (today + timedelta(days=1)).date()
-        elif day_text in weekdays:
-            # English weekday name e.g. "Mon", "Tue"...
-            current_weekday = today.weekday()  # 0 = Monday, 6 = Sunday
-            target_weekday = weekdays.index(day_text)
-            # How many days from 'today' to 'day_text'
-            days_ahead = (target_weekday - current_weekday) % 7
-            match_date = (today + timedelta(days=days_ahead)).date()
-        else:
-            # If it's a date like "24.12." or something else
-            # we can try direct parsing if you prefer, 
-            # but for now let's just return None
-            logging.error(f"Unknown day_text format: '{day_text}' in '{date_str}'")
-            return None
-
-        # 2) Parse the time (HH:MM)
-        try:
-            match_t = datetime.strptime(time_text, "%H:%M").time()
-        except ValueError:
-            logging.error(f"Error parsing time '{time_text}' in '{date_str}'")
-            return None
+    # Nothing to parse if the page is identical to the last saved run
+    digest = page_hash(driver.page_source)
+    if is_unchanged(HASH_PATH, digest, PARQUET_PATH):
+        return None, digest, None
 
-        # Combine date + time
-        return datetime.combine(match_date, match_t)
+    # One dict per match; the kickoff text is parsed for all rows at once in run()
+    rows = []
 
     # Get all competitions
-    competitions = driver.find_elements(By.CSS_SELECTOR, ".competition article")
+    # All competitions in one execute_script call instead of ~6 round-trips per article
+    competitions = driver.execute_script(COMPETITIONS_JS) or []
+    read_at = datetime.now()
 
     for i in competitions:
-        # League
-        leagues_el = i.find_element(By.CSS_SELECTOR, ".infos .leagueName")
-        league_name.append(leagues_el.text)
-
         # Teams
-        teams_el = i.find_element(By.CSS_SELECTOR, ".part1 .pairs")
-        teams_text = teams_el.text   # e.g. "Mon 18:30\nTeamA\nTeamB" or "TeamA\nTeamB"
+        teams_text = i['pairs'] or ""   # e.g. "Mon 18:30\nTeamA\nTeamB" or "TeamA\nTeamB"
 
         # Time text
         # Sometimes the .time element has "Mon 18:30"
-        # Let's extract that
-        try:
-            match_time_el = i.find_element(By.CSS_SELECTOR, '.part1 .time')
-            time_raw = match_time_el.text.strip()  # e.g. "Mon 18:30"
-        except:
-            time_raw = ""  # fallback
-
-        # Parse the date/time
-        dt_obj = parse_date(time_raw)
-        match_datetime_list.append(dt_obj)
+        time_raw = (i['time'] or "").strip()  # e.g. "Mon 18:30"
 
         # Now parse the teams (like your code does)
         temp = teams_text.split("\n")
@@ -195,51 +178,88 @@ def run():
             local_home = temp[0].strip()
             local_away = temp[1].strip()
         # else we might have just 1 line or none, fallback
-        match_home.append(local_home)
-        match_away.append(local_away)
 
         # Extract odds
-        odds = i.find_elements(By.CSS_SELECTOR, "div.part2>div.part2wrapper >div.partvar.odds")
+        odds = i['odds']
         # odds[0] => 1, odds[1] => x, odds[2] => 2
-        if len(odds) >= 3:
-            odds_value_1.append(odds[0].text)
-            odds_value_x.append(odds[1].text)
-            odds_value_2.append(odds[2].text)
-        else:
-            odds_value_1.append("")
-            odds_value_x.append("")
-            odds_value_2.append("")
-
-    driver.quit()
-
-    # Build final dictionary
-    xy = {
-        'leagues': league_name, 
-        'time': match_datetime_list,
-        'home': match_home,
-        'away': match_away,
-        '1': odds_value_1, 
-        'x': odds_value_x,
-        '2': odds_value_2
-    }
-
-    # Check lengths
-    array_lengths = [len(v) for v in xy.values()]
-    if not all(l == array_lengths[0] for l in array_lengths):
-        logging.error("Warning: arrays have different lengths!")
-        max_len = max(array_lengths)
-        for k, v in xy.items():
-            while len(v) < max_len:
-                v.append("")  # pad with empty
-
-    df = pd.DataFrame.from_dict(xy)
-    logging.info(df.head())
-
-    # Save to Excel & Pickle
-    df.to_excel('data/takmicenjemozza.xlsx', index=False)
-    with open('pickle_data/takmicenjemozzabin.pkl', 'wb') as output:
-        pickle.dump(df, output)
-    logging.info("Succesfully saved to data/takmicenjemozza.xlsx and pickle_data/takmicenjemozzabin")
+        if len(odds) < 3:
+            odds = ["", "", ""]
+
+        rows.append({
+            'leagues': i['league'] or "",
+            'time_raw': time_raw,
+            'home': local_home,
+            'away': local_away,
+            '1': odds[0],
+            'x': odds[1],
+            '2': odds[2]
+        })
+
+    return rows, digest, read_at
+
+
+def run():
+    # **Configure Logging Inside the Run Function**
+    os.makedirs(LOG_DIR, exist_ok=True)
+    # Own logger and file handler instead of basicConfig, which only configures the
+    # shared root logger once per process; WARNING by default, LOG_LEVEL=INFO/DEBUG for detail
+    for old_handler in logger.handlers[:]:
+        logger.removeHandler(old_handler)
+        old_handler.close()
+    handler = logging.FileHandler(os.path.join(LOG_DIR, 'scrapermozza.log'), mode='w')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING').upper())
+    logger.propagate = False
+
+    logger.info("Starting scraper_mozza")
+
+    # Take an already started Chrome from the shared pool
+    try:
+        driver = DRIVER_POOL.acquire(timeout=ACQUIRE_TIMEOUT)
+        logger.info("WebDriver acquired successfully.")
+    except queue.Empty:
+        logger.error("No pooled WebDriver became free within %ss.", ACQUIRE_TIMEOUT)
+        return
+    except WebDriverException as e:
+        logger.error("Error initializing WebDriver: %s", e)
+        return
+
+    # Resetting the driver for the pool runs in the background, overlapping with
+    # building and writing the DataFrame
+    with ThreadPoolExecutor(max_workers=2) as io_pool:
+        try:
+            rows, digest, read_at = scrape(driver)
+        finally:
+            io_pool.submit(DRIVER_POOL.release, driver)
+
+        if rows is None:
+            logger.info("Page unchanged since the last run, skipping.")
+            return
+
+        df = pd.DataFrame.from_records(rows, columns=['leagues', 'time_raw', 'home', 'away', '1', 'x', '2'])
+        df.insert(1, 'time', parse_kickoffs(df.pop('time_raw'), read_at))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(df.head().to_string())
+
+        # Save to Parquet (atomic, read by the surebet loaders from pickle_data);
+        # Excel only on request, openpyxl is by far the slowest writer, written alongside
+        excel_future = None
+        if os.environ.get('EMIT_XLSX'):
+            excel_future = io_pool.submit(df.to_excel, 'data/takmicenjemozza.xlsx', index=False)
+        write_parquet_atomic(df, PARQUET_PATH)
+        store_hash(HASH_PATH, digest)
+        if excel_future is not None:
+            excel_future.result()
+        logger.info("Succesfully saved to %s", PARQUET_PATH)
+
+async def run_async():
+    """
+    Runs the blocking Selenium scrape in the default executor, so it can be
+    awaited alongside other scrapers on one event loop.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, run)
 
 if __name__ == "__main__":
-    run()
+    asyncio.run(run_async())
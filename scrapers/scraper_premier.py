@@ -1,7 +1,7 @@
 import logging
 import os
 import time
-import pickle
+import joblib
 import pandas as pd
 import re
 import datetime
@@ -20,8 +20,8 @@ from selenium.common.exceptions import (
     WebDriverException
 )
 
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
+from scrapers.driver_cache import create_chrome
+from scrapers.storage import is_fresh
 
 # Configure logging
 logging.basicConfig(
@@ -31,47 +31,89 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def parse_teams(teams_str: str) -> (str, str):
+# Strips the weekday from kickoff dates ("26.12. čet" -> "26.12.")
+_DATE_STRIP_RE = re.compile(r'\s+\w+')
+
+# A run is skipped while its last pickle is younger than this (0 disables the check)
+TTL_SECONDS = int(os.environ.get("SCRAPER_TTL_SECONDS", 300))
+
+# Cell order of a scraped row, before teams and kickoff are parsed
+RAW_COLUMNS = ["match_no", "teams_raw", "date_raw", "1", "x", "2", "1x", "x2", "12"]
+COLUMNS = ["match_no", "home", "away", "time", "1", "x", "2", "1x", "x2", "12"]
+ODDS_COLUMNS = ["1", "x", "2", "1x", "x2", "12"]
+
+# Selectors shared by the waits, the Selenium lookups and ROWS_JS
+TABLE_CSS = "div.prPrikaz-overflow-container table.ponTablica"
+MATCH_ROW_CSS = f"{TABLE_CSS} > tbody tr[data-who]"
+SVE_TOGGLE_XPATH = "//span[@data-what='toggle' and contains(text(), 'SVE')]"
+SVE_MENU_XPATH = f"{SVE_TOGGLE_XPATH}/ancestor::li[contains(@class, 'subm')]"
+NOGOMET_TOGGLE_XPATH = "//li[contains(@class, 'subm')]//span[@data-what='toggle' and contains(text(), 'NOGOMET')]"
+ADDRM_XPATH = "./following-sibling::span[@data-what='addRm']"
+
+# Returns the first nine cell texts of every match row in one WebDriver call
+# instead of one find_elements/.text round trip per row and cell.
+ROWS_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(tr =>
+    Array.from(tr.querySelectorAll('td')).slice(0, 9).map(td => td.innerText.trim())
+);
+"""
+
+def parse_teams(teams_raw: pd.Series) -> pd.DataFrame:
     """
-    Parse the teams string (e.g. "Pisa-SassuoloLIVETV") into home and away team names.
+    Split team strings (e.g. "Pisa-SassuoloLIVETV") into home and away columns.
+    Strings without a '-' give "N/A" for both.
     """
-    try:
-        teams_clean = re.sub(r'LIVETV', '', teams_str).strip()
-        if '-' in teams_clean:
-            home, away = teams_clean.split('-', 1)
-            return home.strip(), away.strip()
-        else:
-            return "N/A", "N/A"
-    except Exception as e:
-        logging.error(f"Error parsing teams from '{teams_str}': {e}")
-        return "N/A", "N/A"
-
-def parse_kickoff(kickoff_text: str):
+    parts = teams_raw.str.replace('LIVETV', '', regex=False).str.strip().str.partition('-')
+    has_sep = parts[1] != ''
+    return pd.DataFrame({
+        "home": parts[0].str.strip().where(has_sep, "N/A"),
+        "away": parts[2].str.strip().where(has_sep, "N/A"),
+    })
+
+def parse_kickoffs(date_raw: pd.Series, current_year: int) -> pd.Series:
     """
-    Parse a kickoff text like "26.12. čet,12:30" into a datetime.
-    Returns datetime or "N/A" on error.
+    Parse kickoff texts like "26.12. čet,12:30" into datetimes in current_year.
+    Unparsable values become NaT.
     """
-    try:
-        date_part, time_part = kickoff_text.split(',', 1)
-        date_clean = re.sub(r'\s+\w+', '', date_part).strip()
-        current_year = datetime.datetime.now().year
-        date_time_str = f"{date_clean} {time_part.strip()} {current_year}"
-        return datetime.datetime.strptime(date_time_str, "%d.%m. %H:%M %Y")
-    except Exception as e:
-        logging.error(f"Error parsing kickoff '{kickoff_text}': {e}")
-        return "N/A"
-
-def hover_element(actions, element, label="(unknown)") -> bool:
+    parts = date_raw.str.partition(',')
+    date_clean = parts[0].str.replace(_DATE_STRIP_RE, '', regex=True).str.strip()
+    return pd.to_datetime(
+        date_clean + ' ' + parts[2].str.strip() + f' {current_year}',
+        format="%d.%m. %H:%M %Y", errors='coerce'
+    )
+
+def build_frame(rows: list, current_year: int) -> pd.DataFrame:
     """
-    Safely hovers over an element to reveal submenus.
+    Turns scraped cell rows into the output frame: teams and kickoffs are parsed
+    column-wise, odds become float32 and duplicate matches are dropped.
+    """
+    if not rows:
+        return pd.DataFrame(columns=COLUMNS)
+    raw = pd.DataFrame.from_records(rows, columns=RAW_COLUMNS)
+    df = pd.concat([raw[["match_no"]], parse_teams(raw["teams_raw"])], axis=1)
+    df["time"] = parse_kickoffs(raw["date_raw"], current_year)
+    unparsed = df["time"].isna().sum()
+    if unparsed:
+        logging.warning(f"{unparsed} kickoff(s) could not be parsed.")
+    for col in ODDS_COLUMNS:
+        df[col] = pd.to_numeric(raw[col].str.replace(',', '.'), errors='coerce').astype('float32')
+    # The same match can appear in more than one table
+    return df.drop_duplicates(subset=["match_no", "home", "away"], ignore_index=True)
+
+def hover_element(driver, actions, element, reveal_locator, label="(unknown)", timeout=5) -> bool:
+    """
+    Safely hovers over an element and waits until the submenu at reveal_locator is visible.
     """
     try:
         actions.move_to_element(element).perform()
-        time.sleep(1.0)  # allow sub-menu to appear
+        WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(reveal_locator))
         return True
     except StaleElementReferenceException as e:
         logging.warning(f"Stale while hovering over {label}: {e}")
         return False
+    except TimeoutException:
+        logging.warning(f"Submenu not visible {timeout}s after hovering over {label}.")
+        return False
 
 def click_element(element, description: str, retries: int = 3) -> bool:
     """
@@ -95,67 +137,25 @@ def scrape_all_tables(driver) -> list:
          <table class="ponTablica"> ... </table>
          <table class="ponTablica"> ... </table>
          ...
-    Returns a list of unique match dictionaries (deduplicated).
+    Returns the raw cell texts of every match row (see RAW_COLUMNS); parsing and
+    deduplication happen column-wise in build_frame().
     """
-    all_matches = {}
+    all_matches = []
     try:
         # Wait until at least one table is visible
         WebDriverWait(driver, 15).until(
-            EC.visibility_of_element_located((
-                By.CSS_SELECTOR,
-                "div.prPrikaz-overflow-container table.ponTablica"
-            ))
+            EC.visibility_of_element_located((By.CSS_SELECTOR, TABLE_CSS))
         )
 
-        # Collect all table bodies
-        table_bodies = driver.find_elements(
-            By.CSS_SELECTOR,
-            "div.prPrikaz-overflow-container table.ponTablica > tbody"
-        )
-        logging.info(f"Found {len(table_bodies)} <tbody> elements for ponTablica tables.")
+        # Pull every row's cell texts in a single round trip
+        rows = driver.execute_script(ROWS_JS, MATCH_ROW_CSS) or []
 
-        for t_idx, table_body in enumerate(table_bodies, start=1):
-            try:
-                rows = table_body.find_elements(By.CSS_SELECTOR, "tr[data-who]")
-                logging.info(f"Table {t_idx}: Found {len(rows)} match rows.")
-                for row_idx, row in enumerate(rows, start=1):
-                    try:
-                        cols = row.find_elements(By.TAG_NAME, "td")
-                        if len(cols) < 9:
-                            logging.warning(f"Table {t_idx} Row {row_idx} has <9 columns. Skipping.")
-                            continue
-                        match_no    = cols[0].text.strip()
-                        teams_str   = cols[1].text.strip()
-                        date_time_str = cols[2].text.strip()
-                        odd_1       = cols[3].text.strip()
-                        odd_x       = cols[4].text.strip()
-                        odd_2       = cols[5].text.strip()
-                        odd_1x      = cols[6].text.strip()
-                        odd_x2      = cols[7].text.strip()
-                        odd_12      = cols[8].text.strip()
-
-                        home, away  = parse_teams(teams_str)
-                        kickoff_dt  = parse_kickoff(date_time_str)
-
-                        # Use a tuple (match_no, home, away) as unique key
-                        key = (match_no, home, away)
-                        if key not in all_matches:
-                            all_matches[key] = {
-                                "match_no": match_no,
-                                "home": home,
-                                "away": away,
-                                "time": kickoff_dt,
-                                "1":  odd_1,
-                                "x":  odd_x,
-                                "2":  odd_2,
-                                "1x": odd_1x,
-                                "x2": odd_x2,
-                                "12": odd_12
-                            }
-                    except Exception as row_ex:
-                        logging.error(f"Error parsing row in Table {t_idx}, row {row_idx}: {row_ex}")
-            except Exception as tb_ex:
-                logging.error(f"Error parsing Table {t_idx}: {tb_ex}")
+        # The rows are plain strings read in one evaluation, so nothing here can go stale
+        for row_idx, cols in enumerate(rows, start=1):
+            if len(cols) < 9:
+                logging.warning(f"Row {row_idx} has <9 columns. Skipping.")
+                continue
+            all_matches.append(cols)
     except TimeoutException:
         logging.info("No tables loaded within 15s. Possibly no matches found or slow page.")
     except NoSuchElementException:
@@ -163,9 +163,15 @@ def scrape_all_tables(driver) -> list:
     except Exception as e:
         logging.error(f"General error scraping all tables: {e}")
 
-    return list(all_matches.values())
+    return all_matches
 
 def run():
+    # The surebet step archives the pickle away, so a missing one always forces a scrape
+    pickle_path = "pickle_data/takmicenjepremierbin.pkl"
+    if is_fresh(pickle_path, TTL_SECONDS):
+        logging.info(f"{pickle_path} is younger than {TTL_SECONDS}s, skipping scrape.")
+        return
+
     url = "https://www.premier-kladionica.com/ponuda"
     options = webdriver.ChromeOptions()
     options.add_argument("--start-maximized")
@@ -174,19 +180,21 @@ def run():
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
+    # Only text is scraped: skip images/fonts and return from get() at DOMContentLoaded
+    options.page_load_strategy = 'eager'
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+        'profile.managed_default_content_settings.fonts': 2,
+    })
 
     driver = None
 
     try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
+        driver = create_chrome(options)
         logging.info("WebDriver initialized successfully.")
 
         driver.get(url)
         logging.info(f"Navigated to {url}")
-        time.sleep(3)  # let main page load
 
         actions = ActionChains(driver)
         all_matches = []
@@ -195,7 +203,7 @@ def run():
         try:
             sve_button = WebDriverWait(driver, 40).until(
                 EC.visibility_of_element_located(
-                    (By.XPATH, "//span[@data-what='toggle' and contains(text(), 'SVE')]")
+                    (By.XPATH, SVE_TOGGLE_XPATH)
                 )
             )
             logging.info(f"Located 'SVE' button: {sve_button.text}")
@@ -203,37 +211,18 @@ def run():
             logging.error("Could not locate 'SVE' button. Exiting.")
             return
 
-        # 2) Hover over "SVE"
-        if not hover_element(actions, sve_button, label="'SVE' button"):
-            logging.error("Failed to hover over 'SVE' button. Exiting.")
-            return
-        logging.info("Hovered on 'SVE' button to reveal submenu.")
-
-        # 3) Wait for the parent li to have 'subm' class
-        try:
-            sve_li = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        "//span[@data-what='toggle' and contains(text(), 'SVE')]"
-                        "/ancestor::li[contains(@class, 'subm')]"
-                    )
-                )
-            )
-            logging.info("'SVE' parent li with subm/doScroll/noScroll is visible.")
-        except TimeoutException as e:
-            logging.error(f"Submenu not visible after hovering over 'SVE': {e}")
+        # 2-3) Hover over "SVE" until its parent li (class 'subm') shows the submenu
+        if not hover_element(driver, actions, sve_button, (By.XPATH, SVE_MENU_XPATH),
+                             label="'SVE' button", timeout=10):
+            logging.error("Failed to reveal the 'SVE' submenu. Exiting.")
             return
+        logging.info("Hovered on 'SVE' button; submenu is visible.")
 
         # 4) Locate "NOGOMET" toggler
         try:
             nogomet_toggle = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        "//li[contains(@class, 'subm')]"
-                        "//span[@data-what='toggle' and contains(text(), 'NOGOMET')]"
-                    )
+                    (By.XPATH, NOGOMET_TOGGLE_XPATH)
                 )
             )
             logging.info(f"Located NOGOMET toggle: {nogomet_toggle.text}")
@@ -243,10 +232,7 @@ def run():
 
         # 5) Find the addRm next to "NOGOMET" toggle & click
         try:
-            nogomet_addrm = nogomet_toggle.find_element(
-                By.XPATH,
-                "./following-sibling::span[@data-what='addRm']"
-            )
+            nogomet_addrm = nogomet_toggle.find_element(By.XPATH, ADDRM_XPATH)
             if not click_element(nogomet_addrm, "addRm for 'NOGOMET'"):
                 logging.error("Could not click addRm for 'NOGOMET'. Exiting.")
                 return
@@ -254,7 +240,13 @@ def run():
 
             # Optional unhover: move mouse away from the left panel to close the sub-menu
             actions.move_by_offset(300, 0).perform()
-            time.sleep(6)  # Wait longer for large match-lists to load fully
+            # Large match-lists take a while; continue as soon as the first rows are in
+            try:
+                WebDriverWait(driver, 30).until(
+                    lambda d: d.find_elements(By.CSS_SELECTOR, MATCH_ROW_CSS)
+                )
+            except TimeoutException:
+                logging.warning("No 'NOGOMET' match rows appeared within 30s.")
 
             # Now do a *single pass* scraping:
             nogo_matches = scrape_all_tables(driver)
@@ -265,20 +257,27 @@ def run():
             logging.error(f"Could not find addRm near 'NOGOMET' toggler: {e}")
             return
 
-        logging.info(f"Total matches collected: {len(all_matches)}")
+        logging.info(f"Total rows collected: {len(all_matches)}")
 
         # 6) Save results
-        df = pd.DataFrame(all_matches)
+        df = build_frame(all_matches, datetime.datetime.now().year)
         logging.info(f"DataFrame created with {len(df)} rows.")
 
+        # Parquet replaces the (slow) Excel export; set EMIT_XLSX to still get the .xlsx
         os.makedirs("data", exist_ok=True)
-        df.to_excel("data/takmicenjepremier.xlsx", index=False)
-        logging.info("Data saved to data/takmicenjepremier.xlsx")
+        df.to_parquet("data/takmicenjepremier.parquet", engine="pyarrow", compression="zstd", index=False)
+        logging.info("Data saved to data/takmicenjepremier.parquet")
+        if os.environ.get("EMIT_XLSX"):
+            # xlsxwriter in constant_memory mode streams rows instead of holding the sheet
+            with pd.ExcelWriter("data/takmicenjepremier.xlsx", engine="xlsxwriter",
+                                engine_kwargs={"options": {"constant_memory": True}}) as writer:
+                df.to_excel(writer, index=False)
+            logging.info("Data saved to data/takmicenjepremier.xlsx")
 
         os.makedirs("pickle_data", exist_ok=True)
-        with open("pickle_data/takmicenjepremierbin.pkl", "wb") as f:
-            pickle.dump(df, f)
-        logging.info("Data pickled to pickle_data/takmicenjepremierbin.pkl")
+        # Compressed joblib dump; the surebet loaders read it with joblib.load
+        joblib.dump(df, pickle_path, compress=3)
+        logging.info(f"Data pickled to {pickle_path}")
 
     except Exception as e:
         logging.error(f"Unhandled exception in run(): {e}")
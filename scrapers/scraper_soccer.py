@@ -1,73 +1,123 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import datetime
-import time
 import pandas as pd
-import pickle
 from selenium.common.exceptions import (
-    NoSuchElementException,
     StaleElementReferenceException,
     TimeoutException,
     WebDriverException,
 )
 import re
+import json
 import logging
 import os
 
-def expand_shadow_element(driver, element):
+from scrapers.driver_cache import create_chrome
+from scrapers.driver_pool import block_resources
+from scrapers.storage import is_fresh, write_parquet_atomic
+
+MATCH_ROW_CSS = "ion-item-sliding.prematch-top-desk--content"
+PARQUET_PATH = "pickle_data/soccerbetbin.parquet"
+
+# Rows are journaled here while scraping; a run that crashes is resumed from it
+# if the next one starts within PARTIAL_MAX_AGE seconds, otherwise it is discarded.
+PARTIAL_PATH = "data/soccer_partial.jsonl"
+PARTIAL_MAX_AGE = 600
+# Rows without a data-id are keyed by DOM position, which does not identify the
+# same match in another run, so those rows are never journaled or resumed.
+POSITIONAL_KEY_PREFIX = "match_"
+
+# host:port of an already running Chrome to reuse instead of starting one per run
+DEBUGGER_ADDRESS = os.environ.get("CHROME_DEBUGGER_ADDRESS")
+
+# Bosnian day abbreviations shown in the kickoff cell, mapped to English
+_DAY_MAPPING = {
+    "Pon": "Mon",
+    "Uto": "Tue",
+    "Sri": "Wed",
+    "Čet": "Thu",
+    "Pet": "Fri",
+    "Sub": "Sat",
+    "Ned": "Sun",
+    "Sre": "Wed"  # Based on your output
+}
+_DATE_RE = re.compile(r'(\d{2})\.(\d{2})\.')
+
+# Output columns; the odds follow the order of the ds-odd elements in a row
+ODDS_COLUMNS = ["1", "x", "2", "Over_2.5", "Under_2.5", "Both_Teams_Score",
+                "Home_Win_By_1", "Away_Win_By_1", "Draw_No_Bet"]
+COLUMNS = ["time", "home", "away", *ODDS_COLUMNS]
+
+# Keeps window.__rowCount up to date from a MutationObserver, so waiting for new
+# rows polls a single number instead of fetching every row element each time.
+OBSERVE_ROWS_JS = """
+const css = arguments[0];
+const count = () => { window.__rowCount = document.querySelectorAll(css).length; };
+if (window.__rowObserver) window.__rowObserver.disconnect();
+window.__rowObserver = new MutationObserver(count);
+// Rows are slotted into ion-content, not into its shadow scroll container
+window.__rowObserver.observe(document.body, {childList: true, subtree: true});
+count();
+"""
+# Walks the selector path in the page, stepping into each match's shadow root when
+# it has one, instead of a find_element/shadowRoot round-trip per level.
+SHADOW_PATH_JS = """
+let root = document;
+for (const selector of arguments[0]) {
+    root = (root.shadowRoot || root).querySelector(selector);
+    if (!root) return null;
+}
+return root;
+"""
+ROW_COUNT_JS = """
+return window.__rowCount !== undefined
+    ? window.__rowCount
+    : document.querySelectorAll(arguments[0]).length;
+"""
+
+# Scrolls the container to the bottom and returns its height and the row count from
+# before the scroll in the same round-trip.
+SCROLL_TO_BOTTOM_JS = """
+const container = arguments[0];
+const state = {
+    height: container.scrollHeight,
+    rows: window.__rowCount !== undefined
+        ? window.__rowCount
+        : document.querySelectorAll(arguments[1]).length,
+};
+container.scrollTop = container.scrollHeight;
+return state;
+"""
+
+def wait_for_row_growth(driver, css, prev_count, timeout=5):
     """
-    Expand a shadow root element.
-
-    Args:
-        driver: Selenium WebDriver instance.
-        element: WebElement representing the shadow host.
+    Waits until more than prev_count elements match css (see OBSERVE_ROWS_JS).
 
     Returns:
-        WebElement representing the shadow root, or None if not found.
+        True if new rows were attached within timeout, else False.
     """
     try:
-        shadow_root = driver.execute_script('return arguments[0].shadowRoot', element)
-        return shadow_root
-    except WebDriverException:
-        # Shadow root not found
-        return None
-
-def get_shadow_element_recursive(driver, root, selectors):
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script(ROW_COUNT_JS, css) > prev_count
+        )
+        return True
+    except TimeoutException:
+        return False
+
+def wait_until_visible(driver, element, timeout=2):
     """
-    Recursively traverse shadow roots to find the desired element.
-
-    Args:
-        driver: Selenium WebDriver instance.
-        root: Current root element to search within.
-        selectors: List of CSS selectors representing the path to the desired element.
-
-    Returns:
-        WebElement if found, else None.
+    Waits until element is displayed; a timeout or stale element is only logged.
     """
     try:
-        if not selectors:
-            return root
-        selector = selectors.pop(0)
-        element = root.find_element(By.CSS_SELECTOR, selector)
-        shadow_root = expand_shadow_element(driver, element)
-        if shadow_root:
-            return get_shadow_element_recursive(driver, shadow_root, selectors)
-        else:
-            return get_shadow_element_recursive(driver, element, selectors)
-    except NoSuchElementException:
-        logging.warning(f"Element with selector '{selector}' not found.")
-        return None
-    except Exception as e:
-        logging.error(f"Error traversing shadow DOM: {e}")
-        return None
+        WebDriverWait(driver, timeout).until(EC.visibility_of(element))
+    except (TimeoutException, StaleElementReferenceException) as e:
+        logging.warning(f"Match row not visible after scrolling it into view: {e}")
 
 def get_shadow_element(driver, selectors):
     """
-    Traverse multiple shadow roots to find the desired element.
+    Traverse multiple shadow roots to find the desired element in one script call.
 
     Args:
         driver: Selenium WebDriver instance.
@@ -77,15 +127,14 @@ def get_shadow_element(driver, selectors):
         WebElement if found, else None.
     """
     try:
-        root = driver
-        return get_shadow_element_recursive(driver, root, selectors.copy())
-    except Exception as e:
+        return driver.execute_script(SHADOW_PATH_JS, selectors)
+    except WebDriverException as e:
         logging.error(f"Error traversing selectors '{' > '.join(selectors)}': {e}")
         return None
 
-def parse_kickoff(kickoff_text):
+def parse_kickoff(kickoff_text, current_year):
     """
-    Parse the kickoff text to extract date and time.
+    Parse the kickoff text to extract date and time in current_year.
     Expected format:
         '12:00
         Sre
@@ -100,164 +149,284 @@ def parse_kickoff(kickoff_text):
 
         time_str, day_abbr, date_str = parts
 
-        # Mapping of Bosnian day abbreviations to English
-        day_mapping = {
-            "Pon": "Mon",
-            "Uto": "Tue",
-            "Sri": "Wed",
-            "Čet": "Thu",
-            "Pet": "Fri",
-            "Sub": "Sat",
-            "Ned": "Sun",
-            "Sre": "Wed"  # Based on your output
-        }
-
-        day_str_english = day_mapping.get(day_abbr, day_abbr)
-
-        # Convert date from '25.12.' to '25 12'
-        date_match = re.match(r'(\d{2})\.(\d{2})\.', date_str)
+        # The weekday only has to be a known one; the date itself carries the day
+        if day_abbr not in _DAY_MAPPING and day_abbr not in _DAY_MAPPING.values():
+            logging.warning(f"Unknown day abbreviation: '{day_abbr}'")
+            return "N/A"
+
+        # Convert date from '25.12.' to day and month
+        date_match = _DATE_RE.match(date_str)
         if not date_match:
             logging.warning(f"Date does not match pattern: '{date_str}'")
             return "N/A"
         day, month = date_match.groups()
+        hour, minute = time_str.split(':')
 
-        # Assuming the current year; adjust if necessary
-        current_year = datetime.datetime.now().year
-
-        combined_str = f"{day_str_english} {day} {month} {current_year} {time_str}"
-        logging.info(f"Combined kickoff string: '{combined_str}'")
-
-        # Parse datetime
-        match_dt = datetime.datetime.strptime(combined_str, "%a %d %m %Y %H:%M")
-        return match_dt
+        # Built directly; strptime is several times slower for this fixed layout
+        return datetime.datetime(current_year, int(month), int(day), int(hour), int(minute))
     except Exception as e:
         logging.error(f"Error parsing kickoff information: {e}")
         return "N/A"
 
-def parse_teams(team_elements):
+def parse_teams(team_texts):
     """
-    Parse team elements to extract home and away names.
+    Parse team names read from the row (item text, or its image alt when empty).
 
     Args:
-        team_elements: List of WebElement containing team names.
+        team_texts: List of team name strings, "" where none was found.
 
     Returns:
         Tuple of (home_team, away_team)
     """
-    try:
-        teams = []
-        for team in team_elements:
-            team_text = team.text.strip()
-            if team_text:
-                teams.append(team_text)
-            else:
-                # Attempt to extract from alt attribute of images
-                try:
-                    img = team.find_element(By.TAG_NAME, "img")
-                    team_text = img.get_attribute("alt").strip()
-                    teams.append(team_text if team_text else "N/A")
-                except NoSuchElementException:
-                    teams.append("N/A")
-        if len(teams) >= 2:
-            return teams[0], teams[1]
-        else:
-            return "N/A", "N/A"
-    except Exception as e:
-        logging.error(f"Error parsing team names: {e}")
+    teams = [text.strip() or "N/A" for text in team_texts]
+    if len(teams) >= 2:
+        return teams[0], teams[1]
+    else:
         return "N/A", "N/A"
 
-def parse_odds(driver, ds_odds):
+# Reads kickoff, team names and all odds of one match row in a single WebDriver call;
+# odd spans live in each ds-odd's shadow root when it has one. Missing, empty and
+# "-" odds come back as "N/A".
+MATCH_JS = """
+const row = arguments[0];
+const kickoff = row.querySelector('div.es-match-kickoff');
+return {
+    kickoff: kickoff ? kickoff.innerText.trim() : null,
+    teams: Array.from(row.querySelectorAll('div.es-match-teams--item')).map(item => {
+        const text = item.innerText.trim();
+        if (text) return text;
+        const img = item.querySelector('img');
+        return img ? (img.getAttribute('alt') || '') : '';
+    }),
+    odds: Array.from(row.querySelectorAll('ds-odd')).map(odd => {
+        const span = (odd.shadowRoot || odd).querySelector('span.odd-btn--odd');
+        const value = span ? span.textContent.trim() : '';
+        return value && value !== '-' ? value : 'N/A';
+    }),
+};
+"""
+
+def scrape_match(driver, match, current_year):
     """
-    Parse ds-odd elements to extract odds.
+    Extract one match row.
 
     Args:
         driver: Selenium WebDriver instance.
-        ds_odds: List of WebElement representing ds-odd elements.
+        match: WebElement representing the match row.
+        current_year: Year the kickoff dates are placed in.
 
     Returns:
-        List of odds as strings.
+        Tuple in COLUMNS order: kickoff, home, away and nine odds, "N/A" where missing.
     """
-    odds = []
-    for idx, ds_odd in enumerate(ds_odds, start=1):
-        try:
-            # Attempt to expand the Shadow Root
-            shadow_root_ds_odd = expand_shadow_element(driver, ds_odd)
-            if shadow_root_ds_odd:
-                # Now find the span inside the Shadow Root
-                span_odd = shadow_root_ds_odd.find_element(By.CSS_SELECTOR, "span.odd-btn--odd")
-                odd_value = span_odd.text.strip()
-            else:
-                # If Shadow Root not found, try alternative approach
-                # Directly find the span within ds-odd
-                span_odd = ds_odd.find_element(By.CSS_SELECTOR, "span.odd-btn--odd")
-                odd_value = span_odd.text.strip()
-
-            # Handle cases where odd_value might be empty or invalid
-            if not odd_value or odd_value == "-":
-                odd_value = "N/A"
-            odds.append(odd_value)
-            logging.info(f"Extracted Odd {idx}: {odd_value}")
-        except NoSuchElementException:
-            odds.append("N/A")
-            logging.warning(f"Odd element not found at index {idx}.")
-        except Exception as e:
-            odds.append("N/A")
-            logging.error(f"Error extracting odd at index {idx}: {e}")
-    return odds
+    try:
+        fields = driver.execute_script(MATCH_JS, match)
+    except WebDriverException as e:
+        logging.error(f"Error extracting match row: {e}")
+        return ("N/A",) * len(COLUMNS)
+
+    # Kickoff Time and Date
+    match_dt = "N/A"
+    if fields["kickoff"] is not None:
+        match_dt = parse_kickoff(fields["kickoff"], current_year)
+        logging.debug("Kickoff Date and Time: %s", match_dt)
+    else:
+        logging.warning("Kickoff element not found.")
+
+    # Team Names
+    home_team, away_team = parse_teams(fields["teams"])
+    logging.debug("Teams: %s vs %s", home_team, away_team)
+
+    # Odds, padded to the nine odd columns
+    logging.debug("Found %d ds-odd elements for odds.", len(fields["odds"]))
+    odds = fields["odds"][:len(ODDS_COLUMNS)]
+    odds += ["N/A"] * (len(ODDS_COLUMNS) - len(odds))
+
+    logging.debug("Scraped Match: %s vs %s at %s with odds 1: %s, 2: %s, 3: %s, ...",
+                  home_team, away_team, match_dt, odds[0], odds[1], odds[2])
+    return (match_dt, home_team, away_team, *odds)
+
+def is_incomplete(row):
+    """
+    True if a scraped row is missing its kickoff or every one of its odds.
+    """
+    return row[0] == "N/A" or all(odd == "N/A" for odd in row[3:])
 
-def get_unique_match_key(match, index):
+def _scrape_visible_rows(driver, rows, processed_matches, all_matches, target_match_count, current_year,
+                         journal=None):
     """
-    Generate a unique key for each match.
+    Scrape every row not in processed_matches until target_match_count is reached.
 
     Args:
-        match: WebElement representing the match row.
-        index: Integer representing the match's position.
+        driver: Selenium WebDriver instance.
+        rows: List of WebElement representing the match rows currently in the DOM.
+        processed_matches: Set of keys already scraped; updated in place.
+        all_matches: List of scraped rows; new rows are appended in place.
+        target_match_count: Number of matches after which scraping stops.
+        current_year: Year the kickoff dates are placed in.
+        journal: Open PARTIAL_PATH file each scraped row is appended to, or None.
+
+    Returns:
+        all_matches
+    """
+    for unique_key, match in get_new_matches(driver, rows, processed_matches):
+        if len(all_matches) >= target_match_count:
+            break  # Stop if target is reached
+
+        # Mark as processed
+        processed_matches.add(unique_key)
+
+        logging.debug("Processing match %d/%d", len(all_matches) + 1, target_match_count)
+        row = scrape_match(driver, match, current_year)
+
+        # Rows in the DOM are normally hydrated already; only scroll the ones that
+        # came back without a kickoff or odds into view and read them again
+        if is_incomplete(row):
+            try:
+                driver.execute_script("arguments[0].scrollIntoView(true);", match)
+                wait_until_visible(driver, match)
+                row = scrape_match(driver, match, current_year)
+            except Exception as e:
+                logging.error(f"Error scrolling match into view: {e}")
+        all_matches.append(row)
+        if journal is not None and not unique_key.startswith(POSITIONAL_KEY_PREFIX):
+            write_journal_entry(journal, unique_key, row)
+    return all_matches
+
+def write_journal_entry(journal, unique_key, row):
+    """
+    Append one scraped row to the journal and flush it, so it survives a crash.
+    """
+    journal.write(json.dumps({"key": unique_key, "row": row}, default=str) + "\n")
+    journal.flush()
+
+def load_partial(path=PARTIAL_PATH, max_age=PARTIAL_MAX_AGE):
+    """
+    Load the rows journaled by a run that did not finish.
 
     Returns:
-        String representing the unique key.
+        List of (unique_key, row) tuples keyed by data-id; empty when there is no
+        journal younger than max_age.
+    """
+    entries = []
+    if not is_fresh(path, max_age):
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # last line was cut off by the crash
+            if entry["key"].startswith(POSITIONAL_KEY_PREFIX):
+                continue
+            entries.append((entry["key"], tuple(entry["row"])))
+    return entries
+
+def open_journal(entries, path=PARTIAL_PATH):
+    """
+    Start a fresh journal at path, rewriting the resumed (unique_key, row) entries into it.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    journal = open(path, "w", encoding="utf-8")
+    for unique_key, row in entries:
+        write_journal_entry(journal, unique_key, row)
+    return journal
+
+def get_new_matches(driver, rows, processed_matches):
+    """
+    Pair each not yet processed row with its unique key.
+
+    The data-id attributes of all rows are read in a single script call instead of
+    one get_attribute round trip per row; rows without one fall back to a positional
+    "match_<index>" key.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        rows: List of WebElement representing the match rows.
+        processed_matches: Set of keys already scraped.
+
+    Returns:
+        List of (unique_key, match) tuples for rows not in processed_matches.
     """
     try:
-        # Attempt to extract a unique attribute (e.g., data-id)
-        unique_id = match.get_attribute("data-id")
-        if unique_id:
-            return unique_id
-    except Exception:
-        pass
+        ids = driver.execute_script(
+            "return Array.from(arguments[0]).map(e => e.getAttribute('data-id'));", rows
+        )
+    except WebDriverException as e:
+        logging.warning(f"Could not read data-id attributes: {e}")
+        ids = [None] * len(rows)
+
+    new_matches = []
+    for idx, (unique_id, match) in enumerate(zip(ids, rows), start=1):
+        unique_key = unique_id or f"{POSITIONAL_KEY_PREFIX}{idx}"
+        if unique_key not in processed_matches:
+            new_matches.append((unique_key, match))
+    return new_matches
+
+def create_driver():
+    """
+    Start Chrome for a run, or attach to the one at CHROME_DEBUGGER_ADDRESS.
+
+    An attached browser was started externally (e.g. chrome --headless
+    --remote-debugging-port=9222 --user-data-dir=/tmp/chrome-scraper) and stays up
+    between runs; each run works in a new tab of it.
+    """
+    options = webdriver.ChromeOptions()
+    if DEBUGGER_ADDRESS:
+        # Launch switches/prefs can't be applied to a running browser
+        options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
+        driver = create_chrome(options)
+        driver.switch_to.new_window('tab')
+        return driver
 
-    # Fallback to using the match index combined with other attributes
-    return f"match_{index}"
+    options.add_argument("--start-maximized")
+    # Uncomment the following line to run in headless mode
+    options.add_argument("--headless")
+    # To prevent detection, you can add more options
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    # Only text and alt attributes are read: skip images and notification prompts
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    return create_chrome(options)
+
+def close_driver(driver):
+    """
+    Quit a driver from create_driver(); an attached browser only loses this run's tab.
+    """
+    if DEBUGGER_ADDRESS:
+        driver.close()
+        driver.service.stop()  # stop chromedriver without quitting the shared browser
+    else:
+        driver.quit()
 
 def run():
     # Target website URL
     web = "https://www.soccerbet.ba/ba/sportsko-kladjenje/fudbal/S"
     # **Configure Logging Inside the Run Function**
+    # WARNING by default, LOG_LEVEL=INFO/DEBUG for detail (DEBUG logs every row)
     log_dir = 'log'
     os.makedirs(log_dir, exist_ok=True)
     logging.basicConfig(
         filename=os.path.join(log_dir, 'scraper_soccer.log'),
         filemode='w',
-        level=logging.INFO,
+        level=os.environ.get('LOG_LEVEL', 'WARNING').upper(),
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
 
     logging.info("Starting scraper_soccer")
-    # Initialize the Chrome driver with options
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    # Uncomment the following line to run in headless mode
-    options.add_argument("--headless")
-    # To prevent detection, you can add more options
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-
     try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        driver = create_driver()
+        # Team logos, fonts and trackers are also dropped at the network layer
+        block_resources(driver)
         logging.info("WebDriver initialized successfully.")
     except WebDriverException as e:
         logging.error(f"Error initializing WebDriver: {e}")
         return
 
+    journal = None
     try:
         driver.get(web)
         logging.info(f"Navigated to {web}")
@@ -266,9 +435,9 @@ def run():
         try:
             # Wait up to 15 seconds for the match rows to be present
             WebDriverWait(driver, 15).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "ion-item-sliding.prematch-top-desk--content"))
+                EC.presence_of_all_elements_located((By.CSS_SELECTOR, MATCH_ROW_CSS))
             )
-            match_rows = driver.find_elements(By.CSS_SELECTOR, "ion-item-sliding.prematch-top-desk--content")
+            match_rows = driver.find_elements(By.CSS_SELECTOR, MATCH_ROW_CSS)
             logging.info(f"Found {len(match_rows)} match rows initially.")
         except TimeoutException:
             logging.error("Timed out waiting for match rows to load.")
@@ -278,9 +447,13 @@ def run():
             logging.error("No match rows found. Exiting.")
             return
 
-        # Initialize a list to hold all match data
-        all_matches = []
-        processed_matches = set()  # To avoid duplicates
+        # Initialize a list to hold all match data, resuming a run that did not finish
+        resumed = load_partial()
+        all_matches = [row for _, row in resumed]
+        processed_matches = {unique_key for unique_key, _ in resumed}  # To avoid duplicates
+        if resumed:
+            logging.info(f"Resuming with {len(resumed)} matches from {PARTIAL_PATH}.")
+        journal = open_journal(resumed)
 
         # Define the path to the scrollable container inside Shadow DOM
         selectors = [
@@ -292,7 +465,6 @@ def run():
         scroll_container = get_shadow_element(driver, selectors)
         if not scroll_container:
             logging.error("Scrollable container not found within Shadow DOM.")
-            driver.quit()
             return
         logging.info("Scrollable container found within Shadow DOM.")
 
@@ -300,21 +472,24 @@ def run():
         scroll_attempts = 0
         max_scroll_attempts = 20
         target_match_count = 500
-        last_height = driver.execute_script("return arguments[0].scrollHeight;", scroll_container)
-        
+        last_height = None
+        row_count = len(match_rows)
+        # Kickoffs only carry day and month; assume the current year
+        current_year = datetime.datetime.now().year
+        driver.execute_script(OBSERVE_ROWS_JS, MATCH_ROW_CSS)
+
         while len(all_matches) < target_match_count and scroll_attempts < max_scroll_attempts:
-            # Scroll down by a specific amount
+            # Jump to the bottom so the list loads its next batch in one step; the same
+            # call reports the height and row count the previous scroll left behind
             try:
-                driver.execute_script("arguments[0].scrollTop += 500;", scroll_container)  # Scroll down by 500 pixels
-                logging.info(f"Scrolled down by 500 pixels. Attempt {scroll_attempts + 1}")
-                time.sleep(2)  # Wait for new matches to load
+                state = driver.execute_script(SCROLL_TO_BOTTOM_JS, scroll_container, MATCH_ROW_CSS)
+                logging.info(f"Scrolled to the bottom. Attempt {scroll_attempts + 1}")
             except Exception as e:
                 logging.error(f"Error during incremental scrolling: {e}")
                 break
 
-            # Check if new matches have been loaded
-            new_height = driver.execute_script("return arguments[0].scrollHeight;", scroll_container)
-            if new_height == last_height:
+            # Check if the previous scroll loaded new matches
+            if state["height"] == last_height:
                 # No new content loaded
                 scroll_attempts += 1
                 logging.info(f"No new matches loaded. Scroll attempt {scroll_attempts}/{max_scroll_attempts}")
@@ -322,110 +497,27 @@ def run():
                     logging.info("Maximum scroll attempts reached. Assuming all matches are loaded.")
                     break
             else:
-                last_height = new_height
+                last_height = state["height"]
                 scroll_attempts = 0  # Reset scroll attempts if new content is loaded
 
+            # Continue as soon as new rows are attached instead of always waiting
+            if not wait_for_row_growth(driver, MATCH_ROW_CSS, state["rows"], timeout=3):
+                logging.info("No new rows attached within 3s after scrolling.")
+
             # Re-fetch all current rows after scrolling
             try:
                 rows = WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located(
-                        (By.CSS_SELECTOR, "ion-item-sliding.prematch-top-desk--content")
-                    )
+                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, MATCH_ROW_CSS))
                 )
-                current_row_count = len(rows)
-                logging.info(f"Detected {current_row_count} rows after scrolling.")
+                row_count = len(rows)
+                logging.info(f"Detected {row_count} rows after scrolling.")
             except TimeoutException:
                 logging.warning("Timeout while waiting for rows to load after scrolling.")
                 continue
 
-            # Iterate through each row
-            for idx, match in enumerate(rows, start=1):
-                if len(all_matches) >= target_match_count:
-                    break  # Stop if target is reached
-
-                # Generate a unique key for the match
-                unique_key = get_unique_match_key(match, idx)
-                if unique_key in processed_matches:
-                    continue  # Skip already processed matches
-
-                # Mark as processed
-                processed_matches.add(unique_key)
-
-                # Scroll the current match into view
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView(true);", match)
-                    time.sleep(0.5)  # Small delay to allow any dynamic content to load
-                except Exception as e:
-                    logging.error(f"Error scrolling match into view: {e}")
-
-                logging.info(f"\nProcessing match {len(all_matches)+1}/{target_match_count}")
-                match_data = {
-                    "Kickoff": "N/A",
-                    "Home": "N/A",
-                    "Away": "N/A",
-                    "Odd 1": "N/A",
-                    "Odd 2": "N/A",
-                    "Odd 3": "N/A",
-                    "Odd 4": "N/A",
-                    "Odd 5": "N/A",
-                    "Odd 6": "N/A",
-                    "Odd 7": "N/A",
-                    "Odd 8": "N/A",
-                    "Odd 9": "N/A"
-                }
-
-                # Extract Kickoff Time and Date
-                try:
-                    kickoff_el = match.find_element(By.CSS_SELECTOR, "div.es-match-kickoff")
-                    kickoff_text = kickoff_el.text.strip()
-                    match_dt = parse_kickoff(kickoff_text)
-                    match_data["Kickoff"] = match_dt
-                    logging.info(f"Kickoff Date and Time: {match_dt}")
-                except NoSuchElementException:
-                    logging.warning("Kickoff element not found.")
-                    match_data["Kickoff"] = "N/A"
-                except Exception as e:
-                    logging.error(f"Error extracting kickoff information: {e}")
-                    match_data["Kickoff"] = "N/A"
-
-                # Extract Team Names
-                try:
-                    team_elements = match.find_elements(By.CSS_SELECTOR, "div.es-match-teams--item")
-                    home_team, away_team = parse_teams(team_elements)
-                    match_data["Home"] = home_team
-                    match_data["Away"] = away_team
-                    logging.info(f"Teams: {home_team} vs {away_team}")
-                except Exception as e:
-                    logging.error(f"Error extracting team names: {e}")
-                    match_data["Home"] = "N/A"
-                    match_data["Away"] = "N/A"
-
-                # Extract Odds
-                try:
-                    # Locate all ds-odd elements within the current match row
-                    ds_odds = match.find_elements(By.CSS_SELECTOR, "ds-odd")
-                    logging.info(f"Found {len(ds_odds)} ds-odd elements for odds.")
-                    odds = parse_odds(driver, ds_odds)
-
-                    # Assign odds to match_data
-                    for i in range(1, 10):
-                        key = f"Odd {i}"
-                        if i <= len(odds):
-                            match_data[key] = odds[i-1]
-                        else:
-                            match_data[key] = "N/A"
-                except NoSuchElementException:
-                    logging.warning("No ds-odd elements found in the row.")
-                except Exception as e:
-                    logging.error(f"An error occurred while extracting odds: {e}")
-
-                # Append the extracted data to the list
-                all_matches.append(match_data)
-
-                logging.info(f"Scraped Match: {home_team} vs {away_team} at {match_dt} with odds 1: {match_data['Odd 1']}, 2: {match_data['Odd 2']}, 3: {match_data['Odd 3']}, ...")
-
-                if len(all_matches) >= target_match_count:
-                    break  # Stop if target is reached
+            # Iterate through each new row
+            _scrape_visible_rows(driver, rows, processed_matches, all_matches,
+                                 target_match_count, current_year, journal)
 
             logging.info(f"\nTotal matches collected: {len(all_matches)}/{target_match_count}")
 
@@ -436,104 +528,19 @@ def run():
                 # Scroll back to top
                 driver.execute_script("arguments[0].scrollTop = 0;", scroll_container)
                 logging.info("Scrolled back to the top.")
-                time.sleep(2)  # Wait for any dynamic content to load
+                wait_for_row_growth(driver, MATCH_ROW_CSS, row_count, timeout=2)
 
                 # Scroll down again
                 driver.execute_script("arguments[0].scrollTop += 500;", scroll_container)
                 logging.info("Scrolled down by 500 pixels again.")
-                time.sleep(2)
+                wait_for_row_growth(driver, MATCH_ROW_CSS, row_count, timeout=2)
 
                 # Re-fetch rows and process any new matches
-                rows = driver.find_elements(By.CSS_SELECTOR, "ion-item-sliding.prematch-top-desk--content")
+                rows = driver.find_elements(By.CSS_SELECTOR, MATCH_ROW_CSS)
                 logging.info(f"Detected {len(rows)} rows after bidirectional scrolling.")
 
-                for idx, match in enumerate(rows, start=1):
-                    if len(all_matches) >= target_match_count:
-                        break  # Stop if target is reached
-
-                    # Generate a unique key for the match
-                    unique_key = get_unique_match_key(match, idx)
-                    if unique_key in processed_matches:
-                        continue  # Skip already processed matches
-
-                    # Mark as processed
-                    processed_matches.add(unique_key)
-
-                    # Scroll the current match into view
-                    try:
-                        driver.execute_script("arguments[0].scrollIntoView(true);", match)
-                        time.sleep(0.5)  # Small delay to allow any dynamic content to load
-                    except Exception as e:
-                        logging.error(f"Error scrolling match into view: {e}")
-
-                    logging.info(f"\nProcessing match {len(all_matches)+1}/{target_match_count}")
-                    match_data = {
-                        "Kickoff": "N/A",
-                        "Home": "N/A",
-                        "Away": "N/A",
-                        "Odd 1": "N/A",
-                        "Odd 2": "N/A",
-                        "Odd 3": "N/A",
-                        "Odd 4": "N/A",
-                        "Odd 5": "N/A",
-                        "Odd 6": "N/A",
-                        "Odd 7": "N/A",
-                        "Odd 8": "N/A",
-                        "Odd 9": "N/A"
-                    }
-
-                    # Extract Kickoff Time and Date
-                    try:
-                        kickoff_el = match.find_element(By.CSS_SELECTOR, "div.es-match-kickoff")
-                        kickoff_text = kickoff_el.text.strip()
-                        match_dt = parse_kickoff(kickoff_text)
-                        match_data["Kickoff"] = match_dt
-                        logging.info(f"Kickoff Date and Time: {match_dt}")
-                    except NoSuchElementException:
-                        logging.warning("Kickoff element not found.")
-                        match_data["Kickoff"] = "N/A"
-                    except Exception as e:
-                        logging.error(f"Error extracting kickoff information: {e}")
-                        match_data["Kickoff"] = "N/A"
-
-                    # Extract Team Names
-                    try:
-                        team_elements = match.find_elements(By.CSS_SELECTOR, "div.es-match-teams--item")
-                        home_team, away_team = parse_teams(team_elements)
-                        match_data["Home"] = home_team
-                        match_data["Away"] = away_team
-                        logging.info(f"Teams: {home_team} vs {away_team}")
-                    except Exception as e:
-                        logging.error(f"Error extracting team names: {e}")
-                        match_data["Home"] = "N/A"
-                        match_data["Away"] = "N/A"
-
-                    # Extract Odds
-                    try:
-                        # Locate all ds-odd elements within the current match row
-                        ds_odds = match.find_elements(By.CSS_SELECTOR, "ds-odd")
-                        logging.info(f"Found {len(ds_odds)} ds-odd elements for odds.")
-                        odds = parse_odds(driver, ds_odds)
-
-                        # Assign odds to match_data
-                        for i in range(1, 10):
-                            key = f"Odd {i}"
-                            if i <= len(odds):
-                                match_data[key] = odds[i-1]
-                            else:
-                                match_data[key] = "N/A"
-                    except NoSuchElementException:
-                        logging.warning("No ds-odd elements found in the row.")
-                    except Exception as e:
-                        logging.error(f"An error occurred while extracting odds: {e}")
-
-                    # Append the extracted data to the list
-                    all_matches.append(match_data)
-
-                    logging.info(f"Scraped Match: {home_team} vs {away_team} at {match_dt} with odds 1: {match_data['Odd 1']}, 2: {match_data['Odd 2']}, 3: {match_data['Odd 3']}, ...")
-
-                    if len(all_matches) >= target_match_count:
-                        break  # Stop if target is reached
+                _scrape_visible_rows(driver, rows, processed_matches, all_matches,
+                                     target_match_count, current_year, journal)
 
                 logging.info(f"\nTotal matches collected after bidirectional scrolling: {len(all_matches)}/{target_match_count}")
 
@@ -542,42 +549,32 @@ def run():
 
         logging.info(f"\nFinished scrolling. Total matches collected: {len(all_matches)}")
 
-        # Compile all data into a DataFrame
-        df = pd.DataFrame(all_matches)
-
-        # Define the mapping from existing column names to desired names
-        columns_mapping = {
-            "Kickoff": "time",
-            "Home": "home",
-            "Away": "away",
-            "Odd 1": "1",
-            "Odd 2": "x",
-            "Odd 3": "2",
-            "Odd 4": "Over_2.5",
-            "Odd 5": "Under_2.5",
-            "Odd 6": "Both_Teams_Score",
-            "Odd 7": "Home_Win_By_1",
-            "Odd 8": "Away_Win_By_1",
-            "Odd 9": "Draw_No_Bet"
-        }
-
-        # Rename the columns using the mapping
-        df.rename(columns=columns_mapping, inplace=True)
-
-        # Display the updated DataFrame
-        logging.info("\n--- Extracted Data with Renamed Columns ---")
+        # Compile all data into a DataFrame; "N/A" odds become NaN
+        df = pd.DataFrame(all_matches, columns=COLUMNS)
+        for col in ODDS_COLUMNS:
+            df[col] = pd.to_numeric(df[col].str.replace(',', '.'), errors='coerce').astype('float32')
+
+        # Display the DataFrame
+        logging.info("\n--- Extracted Data ---")
         logging.info(df)
 
-        # (Optional) Save the extracted data to files
+        # Parquet needs one type per column; unparsable kickoffs ("N/A") become NaT
+        df["time"] = pd.to_datetime(df["time"], errors="coerce")
+
         try:
-            # Save to Excel
-            df.to_excel("data/takmicenjesoccerbet.xlsx", index=False)
-            logging.info("Data saved to 'soccerbetbin.xlsx' with renamed columns.")
-
-            # Save to Pickle
-            with open("pickle_data/soccerbetbin.pkl", "wb") as f:
-                pickle.dump(df, f)
-            logging.info("Data saved to 'soccerbet_matches_debug.pkl' with renamed columns.")
+            # Excel only on request, openpyxl is by far the slowest writer
+            if os.environ.get("EMIT_XLSX"):
+                os.makedirs("data", exist_ok=True)
+                df.to_excel("data/takmicenjesoccerbet.xlsx", index=False)
+                logging.info("Data saved to 'data/takmicenjesoccerbet.xlsx'.")
+
+            # Save to Parquet (atomic, read by the surebet loaders from pickle_data)
+            write_parquet_atomic(df, PARQUET_PATH)
+            logging.info(f"Data saved to '{PARQUET_PATH}'.")
+
+            # The run finished, nothing left to resume
+            journal.close()
+            os.remove(PARTIAL_PATH)
         except Exception as e:
             logging.error(f"Error saving data: {e}")
 
@@ -585,8 +582,10 @@ def run():
         logging.error(f"An unexpected error occurred: {e}")
 
     finally:
+        if journal is not None:
+            journal.close()
         try:
-            driver.quit()
+            close_driver(driver)
             logging.info("WebDriver closed.")
         except Exception as e:
             logging.error(f"Error closing WebDriver: {e}")
@@ -1,10 +1,9 @@
+import asyncio
 import logging
 import os
-import time
-import pickle
 import pandas as pd
+import queue
 import re
-from selenium import webdriver
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -17,77 +16,91 @@ from selenium.common.exceptions import (
     ElementClickInterceptedException,
     ElementNotInteractableException
 )
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
-import datetime
+
+from scrapers.driver_pool import ACQUIRE_TIMEOUT, DRIVER_POOL
+from scrapers.storage import write_parquet_atomic
 
 # ---------------------------- Configuration ---------------------------- #
 
-# Configure logging
+PARQUET_PATH = "pickle_data/takmicenjesportplusbin.parquet"
+
 LOG_DIR = 'log'
-os.makedirs(LOG_DIR, exist_ok=True)
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, 'scraper_sportplus.log'),
-    filemode='w',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = logging.getLogger('scraper_sportplus')
+
+# Precompiled patterns for the per-row parsers
+_LIVE_RE = re.compile(r'LIVE')
+# e.g. "26.12.2024(čet.) 18:30" -> ("26.12.2024", "18:30")
+_KICKOFF_RE = re.compile(r'(\d{2}\.\d{2}\.\d{4})\(\w+\.\)\s+(\d{2}:\d{2})')
+
+# Columns of a scraped row (see ROWS_JS) and of the output frame
+ODDS_COLUMNS = ["1", "x", "2", "1x", "x2", "12"]
+RAW_COLUMNS = ["match_no", "teams_raw", "date_raw", *ODDS_COLUMNS, "count"]
+
+# Reads every row of a sport container's table in one call. Each row becomes
+# [match_no, teams, date_time, 1, x, 2, 1x, x2, 12, count] (trimmed innerText, null
+# where the element is missing), or null when the row has fewer than 3 cells.
+ROWS_JS = """
+const tbody = arguments[0].querySelector('div.sport-body table > tbody');
+if (!tbody) return null;
+const text = (cell, css) => {
+    const el = cell && cell.querySelector(css);
+    return el ? el.innerText.trim() : null;
+};
+return Array.from(tbody.rows, row => {
+    const c = row.cells;
+    if (c.length < 3) return null;
+    return [
+        c[0].innerText.trim(), text(c[0], 'p'), text(c[1], 'p'),
+        text(c[3], 'button'), text(c[4], 'button'), text(c[5], 'button'),
+        text(c[6], 'button'), text(c[7], 'button'), text(c[8], 'button'),
+        c.length > 9 ? text(c[9], 'p') : 'N/A',
+    ];
+});
+"""
+
+# Match rows of the offer table, watched to tell when a click has loaded new matches
+TABLE_ROW_CSS = "div.sport-body table > tbody > tr"
 
 # ---------------------------- Helper Functions ---------------------------- #
 
-def parse_teams(teams_str):
+def parse_teams(teams_raw: pd.Series) -> pd.DataFrame:
     """
-    Parse the teams string to extract home and away team names.
-    Expected format:
-        'TeamA - TeamB LIVE' --> ('TeamA', 'TeamB')
+    Split team strings (e.g. 'TeamA - TeamB LIVE') into home and away columns.
+    Strings without a '-' give "N/A" for both.
     """
-    try:
-        # Remove any trailing text like 'LIVE' if present
-        teams_clean = re.sub(r'LIVE', '', teams_str).strip()
-        
-        # Split by '-' to get home and away teams
-        if '-' in teams_clean:
-            home, away = teams_clean.split('-', 1)
-            home = home.strip()
-            away = away.strip()
-        else:
-            # If format is unexpected, assign 'N/A'
-            home, away = "N/A", "N/A"
-        
-        return home, away
-    except Exception as e:
-        logging.error(f"Error parsing teams from '{teams_str}': {e}")
-        return "N/A", "N/A"
+    parts = teams_raw.str.replace(_LIVE_RE, '', regex=True).str.strip().str.partition('-')
+    has_sep = parts[1] != ''
+    return pd.DataFrame({
+        "home": parts[0].str.strip().where(has_sep, "N/A"),
+        "away": parts[2].str.strip().where(has_sep, "N/A"),
+    })
 
-def parse_kickoff(kickoff_text):
+def parse_kickoffs(kickoff_raw: pd.Series) -> pd.Series:
     """
-    Parse the kickoff text to extract datetime.
-    Expected format:
-        '26.12.2024(čet.) 18:30' --> datetime object representing the kickoff.
+    Parse kickoff texts like '26.12.2024(čet.) 18:30' into datetimes.
+    Unparsable values become NaT.
     """
-    try:
-        # Example input: "26.12.2024(čet.) 18:30"
-        # Extract date and time using regex
-        match = re.match(r'(\d{2}\.\d{2}\.\d{4})\(\w+\.\)\s+(\d{2}:\d{2})', kickoff_text)
-        if match:
-            date_part = match.group(1)  # "26.12.2024"
-            time_part = match.group(2)  # "18:30"
-            # Combine date and time
-            date_time_combined = f"{date_part} {time_part}"
-            # Parse to datetime object
-            match_dt = datetime.datetime.strptime(date_time_combined, "%d.%m.%Y %H:%M")
-            return match_dt
-        else:
-            # If format is unexpected, assign 'N/A'
-            return "N/A"
-    except Exception as e:
-        logging.error(f"Error parsing kickoff information '{kickoff_text}': {e}")
-        return "N/A"
+    parts = kickoff_raw.str.extract(_KICKOFF_RE)
+    return pd.to_datetime(parts[0] + ' ' + parts[1], format="%d.%m.%Y %H:%M", errors='coerce')
+
+def build_frame(rows: list) -> pd.DataFrame:
+    """
+    Turns scraped cell rows into the output frame, parsing teams and kickoffs column-wise.
+    """
+    raw = pd.DataFrame.from_records(rows, columns=RAW_COLUMNS)
+    df = pd.concat([raw[["match_no"]], parse_teams(raw["teams_raw"])], axis=1)
+    df["time"] = parse_kickoffs(raw["date_raw"])
+    unparsed = df["time"].isna().sum()
+    if unparsed:
+        logger.warning(f"{unparsed} kickoff(s) could not be parsed.")
+    for col in ODDS_COLUMNS + ["count"]:
+        df[col] = raw[col]
+    return df
 
 def scrape_matches(driver):
     """
-    Parses the main match table on the right panel.
-    Returns a list of dictionaries, each representing a match.
+    Reads the main match table on the right panel.
+    Returns a list of raw cell tuples in RAW_COLUMNS order; see build_frame.
     """
     matches_data = []
     try:
@@ -98,57 +111,40 @@ def scrape_matches(driver):
             )
         )
         for container in sport_containers:
-            # Now find the table within sport-body
-            table_body = container.find_element(By.CSS_SELECTOR, "div.sport-body table > tbody")
-            row_elements = table_body.find_elements(By.TAG_NAME, "tr")
-            logging.info(f"Found {len(row_elements)} match rows.")
-            for row in row_elements:
-                try:
-                    cols = row.find_elements(By.TAG_NAME, "td")
-                    if len(cols) < 3:
-                        logging.warning("Row has fewer than 3 columns, skipping.")
-                        continue
-                    # Extract text from columns
-                    match_no = cols[0].text.strip()
-                    teams_str = cols[0].find_element(By.CSS_SELECTOR, "p").text.strip()
-                    date_time_str = cols[1].find_element(By.CSS_SELECTOR, "p").text.strip()
-                    # The stats column is cols[2], which may contain a link with image, ignored
-                    odd_1 = cols[3].find_element(By.TAG_NAME, "button").text.strip()
-                    odd_x = cols[4].find_element(By.TAG_NAME, "button").text.strip()
-                    odd_2 = cols[5].find_element(By.TAG_NAME, "button").text.strip()
-                    odd_1x = cols[6].find_element(By.TAG_NAME, "button").text.strip()
-                    odd_x2 = cols[7].find_element(By.TAG_NAME, "button").text.strip()
-                    odd_12 = cols[8].find_element(By.TAG_NAME, "button").text.strip()
-                    # Count is in the last column, cols[9] if exists
-                    count_str = cols[9].find_element(By.CSS_SELECTOR, "p").text.strip() if len(cols) > 9 else "N/A"
-                    
-                    home_team, away_team = parse_teams(teams_str)
-                    match_datetime = parse_kickoff(date_time_str)
-                    match_info = {
-                        "match_no": match_no,
-                        "home": home_team,
-                        "away": away_team,
-                        "time": match_datetime,
-                        "1": odd_1,
-                        "x": odd_x,
-                        "2": odd_2,
-                        "1x": odd_1x,
-                        "x2": odd_x2,
-                        "12": odd_12,
-                        "count": count_str
-                    }
-                    matches_data.append(match_info)
-                except Exception as ex_row:
-                    logging.error(f"Error parsing a match row: {ex_row}")
+            # Read the whole table within sport-body in one round-trip
+            rows = driver.execute_script(ROWS_JS, container)
+            if rows is None:
+                logger.error("No matches table found in the sport container.")
+                continue
+            logger.info(f"Found {len(rows)} match rows.")
+            for cells in rows:
+                if cells is None:
+                    logger.warning("Row has fewer than 3 columns, skipping.")
                     continue
+                if None in cells:
+                    logger.error(f"Error parsing a match row: missing cell in {cells}")
+                    continue
+                matches_data.append(tuple(cells))
     except TimeoutException:
-        logging.error("Sport container or matches table not found within the given time.")
-    except NoSuchElementException:
-        logging.error("No matches table found in the sport container.")
+        logger.error("Sport container or matches table not found within the given time.")
     except Exception as e:
-        logging.error(f"Unexpected error in scrape_matches: {e}")
+        logger.error(f"Unexpected error in scrape_matches: {e}")
     return matches_data
 
+def wait_for_table_update(driver, old_rows, timeout=5):
+    """
+    Waits until the match rows differ from old_rows (captured before a click),
+    instead of sleeping a fixed time. A timeout is only logged.
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, TABLE_ROW_CSS) != old_rows
+        )
+        return True
+    except TimeoutException:
+        logger.info(f"Match table did not change within {timeout}s.")
+        return False
+
 def safe_click(driver, element, label="(unknown)"):
     """
     Attempts to click an element:
@@ -160,39 +156,37 @@ def safe_click(driver, element, label="(unknown)"):
     try:
         # Scroll the element into view
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        # Wait briefly to ensure it's scrolled
-        time.sleep(0.5)
         
         # Attempt regular click
         element.click()
-        logging.info(f"Successfully clicked on {label} using regular click.")
+        logger.info(f"Successfully clicked on {label} using regular click.")
         return True
     except (ElementClickInterceptedException, ElementNotInteractableException) as e:
-        logging.warning(f"{e.__class__.__name__} on {label}: {e}. Trying ActionChains click.")
+        logger.warning(f"{e.__class__.__name__} on {label}: {e}. Trying ActionChains click.")
         try:
             actions = ActionChains(driver)
             actions.move_to_element(element).click().perform()
-            logging.info(f"Successfully clicked on {label} using ActionChains.")
+            logger.info(f"Successfully clicked on {label} using ActionChains.")
             return True
         except Exception as e_act:
-            logging.warning(f"ActionChains click failed for {label}: {e_act}. Trying JS click.")
+            logger.warning(f"ActionChains click failed for {label}: {e_act}. Trying JS click.")
             try:
                 driver.execute_script("arguments[0].click();", element)
-                logging.info(f"Successfully clicked on {label} using JS click.")
+                logger.info(f"Successfully clicked on {label} using JS click.")
                 return True
             except Exception as e_js:
-                logging.warning(f"JS click also failed for {label}: {e_js}")
-                logging.error(f"Failed to click on {label}.")
+                logger.warning(f"JS click also failed for {label}: {e_js}")
+                logger.error(f"Failed to click on {label}.")
                 return False
     except Exception as e:
-        logging.warning(f"Unexpected exception when clicking on {label}: {e}. Trying JS click.")
+        logger.warning(f"Unexpected exception when clicking on {label}: {e}. Trying JS click.")
         try:
             driver.execute_script("arguments[0].click();", element)
-            logging.info(f"Successfully clicked on {label} using JS click.")
+            logger.info(f"Successfully clicked on {label} using JS click.")
             return True
         except Exception as e_js:
-            logging.warning(f"JS click failed for {label}: {e_js}")
-            logging.error(f"Failed to click on {label}.")
+            logger.warning(f"JS click failed for {label}: {e_js}")
+            logger.error(f"Failed to click on {label}.")
             return False
 
 def click_on_left_side_percentage(driver, element, label="(unknown)", left_percentage=0.2):
@@ -211,11 +205,11 @@ def click_on_left_side_percentage(driver, element, label="(unknown)", left_perce
         x_offset = int(size['width'] * left_percentage)
         y_offset = size['height'] // 2
         actions.move_to_element_with_offset(element, x_offset, y_offset).click().perform()
-        logging.info(f"Successfully clicked on the left {left_percentage*100}% side of {label} using ActionChains.")
+        logger.info(f"Successfully clicked on the left {left_percentage*100}% side of {label} using ActionChains.")
         return True
     except Exception as e:
-        logging.error(f"Failed to click on the left {left_percentage*100}% side of {label}: {e}")
-        logging.error(f"Failed to click on {label}.")
+        logger.error(f"Failed to click on the left {left_percentage*100}% side of {label}: {e}")
+        logger.error(f"Failed to click on {label}.")
         return False
 
 def list_all_nogomet_elements(left_menu):
@@ -227,10 +221,10 @@ def list_all_nogomet_elements(left_menu):
         nogomet_elements = left_menu.find_elements(
             By.XPATH, ".//a[contains(@class, 'has-arrow') and contains(@class, 'soccer') and span[normalize-space(text())='NOGOMET']]"
         )
-        logging.info(f"Found {len(nogomet_elements)} 'NOGOMET' menu items.")
+        logger.info(f"Found {len(nogomet_elements)} 'NOGOMET' menu items.")
         return nogomet_elements
     except Exception as e:
-        logging.error(f"Error listing 'NOGOMET' menu items: {e}")
+        logger.error(f"Error listing 'NOGOMET' menu items: {e}")
         return []
 
 def scroll_offer_scroll(driver):
@@ -242,11 +236,19 @@ def scroll_offer_scroll(driver):
             EC.presence_of_element_located((By.ID, "offerScroll"))
         )
         # Scroll to the bottom
-        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight;", offer_scroll)
-        logging.info("Scrolled 'offerScroll' container to the bottom.")
-        time.sleep(1)  # Allow time for dynamic content to load
+        height = driver.execute_script(
+            "arguments[0].scrollTop = arguments[0].scrollHeight; return arguments[0].scrollHeight;", offer_scroll
+        )
+        logger.info("Scrolled 'offerScroll' container to the bottom.")
+        # Allow up to a second for dynamic content to load, returning as soon as it grows
+        try:
+            WebDriverWait(driver, 1, poll_frequency=0.05).until(
+                lambda d: d.execute_script("return arguments[0].scrollHeight;", offer_scroll) != height
+            )
+        except TimeoutException:
+            pass
     except Exception as e:
-        logging.error(f"Error scrolling 'offerScroll' container: {e}")
+        logger.error(f"Error scrolling 'offerScroll' container: {e}")
 
 def close_overlays(driver):
     """
@@ -258,12 +260,17 @@ def close_overlays(driver):
         for button in consent_buttons:
             try:
                 button.click()
-                logging.info("Closed an overlay by clicking on consent button.")
-                time.sleep(1)  # Wait briefly after closing
+                logger.info("Closed an overlay by clicking on consent button.")
             except Exception as e:
-                logging.warning(f"Failed to click on consent button: {e}")
+                logger.warning(f"Failed to click on consent button: {e}")
+                continue
+            # Wait for the overlay to go away instead of a fixed pause
+            try:
+                WebDriverWait(driver, 1).until(EC.invisibility_of_element(button))
+            except TimeoutException:
+                pass
     except Exception as e:
-        logging.error(f"Error while trying to close overlays: {e}")
+        logger.error(f"Error while trying to close overlays: {e}")
 
 def click_svi_dani(driver):
     """
@@ -276,19 +283,20 @@ def click_svi_dani(driver):
                 (By.XPATH, "//button[normalize-space(text())='Svi dani']")
             )
         )
-        logging.info("Located 'Svi dani' button.")
+        logger.info("Located 'Svi dani' button.")
         
         # Click the 'Svi dani' button
+        old_rows = driver.find_elements(By.CSS_SELECTOR, TABLE_ROW_CSS)
         if safe_click(driver, svi_dani_button, label="Svi dani Button"):
-            logging.info("Clicked on 'Svi dani' button successfully.")
+            logger.info("Clicked on 'Svi dani' button successfully.")
             # Wait for matches to load after clicking 'Svi dani'
-            time.sleep(2)  # Adjust as necessary based on page behavior
+            wait_for_table_update(driver, old_rows)
         else:
-            logging.error("Failed to click on 'Svi dani' button.")
+            logger.error("Failed to click on 'Svi dani' button.")
     except TimeoutException:
-        logging.error("'Svi dani' button not found within the given time.")
+        logger.error("'Svi dani' button not found within the given time.")
     except Exception as e:
-        logging.error(f"Error clicking on 'Svi dani' button: {e}")
+        logger.error(f"Error clicking on 'Svi dani' button: {e}")
 
 def click_ostalo(driver):
     """
@@ -301,19 +309,20 @@ def click_ostalo(driver):
                 (By.XPATH, "//button[normalize-space(text())='Ostalo']")
             )
         )
-        logging.info("Located 'Ostalo' button.")
+        logger.info("Located 'Ostalo' button.")
         
         # Click the 'Svi dani' button
+        old_rows = driver.find_elements(By.CSS_SELECTOR, TABLE_ROW_CSS)
         if safe_click(driver, svi_dani_button, label="Ostalo Button"):
-            logging.info("Clicked on 'Ostalo' button successfully.")
+            logger.info("Clicked on 'Ostalo' button successfully.")
             # Wait for matches to load after clicking 'Svi dani'
-            time.sleep(2)  # Adjust as necessary based on page behavior
+            wait_for_table_update(driver, old_rows)
         else:
-            logging.error("Failed to click on 'Ostalo' button.")
+            logger.error("Failed to click on 'Ostalo' button.")
     except TimeoutException:
-        logging.error("'Ostalo' button not found within the given time.")
+        logger.error("'Ostalo' button not found within the given time.")
     except Exception as e:
-        logging.error(f"Error clicking on 'Ostalo' button: {e}")
+        logger.error(f"Error clicking on 'Ostalo' button: {e}")
 
 # ---------------------------- Main Scraper Function ---------------------------- #
 
@@ -321,92 +330,120 @@ def run():
     """
     Main function to execute the scraping process.
     """
+    os.makedirs(LOG_DIR, exist_ok=True)
+    # Own logger and file handler instead of basicConfig, which only configures the
+    # shared root logger once per process (python -m scrapers runs the scrapers side by side)
+    for old_handler in logger.handlers[:]:
+        logger.removeHandler(old_handler)
+        old_handler.close()
+    handler = logging.FileHandler(os.path.join(LOG_DIR, 'scraper_sportplus.log'), mode='w')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    logger.propagate = False
+
     url = "https://www.sportplus.ba/prematch/betting"
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")  # Run in headless mode; comment out for debugging
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-
-    # Optionally, set a custom User-Agent to mimic real browser behavior
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/131.0.0.0 Safari/537.36"
-    )
-
-    # Initialize WebDriver
+
+    # Take an already started Chrome from the shared pool
     try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), 
-            options=options
-        )
-        logging.info("WebDriver initialized successfully.")
+        driver = DRIVER_POOL.acquire(timeout=ACQUIRE_TIMEOUT)
+        logger.info("WebDriver acquired successfully.")
+    except queue.Empty:
+        logger.error(f"No pooled WebDriver became free within {ACQUIRE_TIMEOUT}s.")
+        return
     except WebDriverException as e:
-        logging.error(f"Error initializing WebDriver: {e}")
+        logger.error(f"Error initializing WebDriver: {e}")
         return
 
+    # The driver goes back to the pool however the scrape ends
+    try:
+        all_matches = scrape(driver, url)
+    finally:
+        DRIVER_POOL.release(driver)
+        logger.info("WebDriver released to the pool.")
+
+    # Save the scraped data
+    if all_matches:
+        try:
+            df = build_frame(all_matches)
+            logger.info(f"DataFrame created with {len(df)} rows.")
+
+            # Excel only on request, openpyxl is by far the slowest writer
+            if os.environ.get("EMIT_XLSX"):
+                os.makedirs("data", exist_ok=True)
+                excel_path = "data/takmicenjesportplus.xlsx"
+                df.to_excel(excel_path, index=False)
+                logger.info(f"Data saved to {excel_path}")
+
+            # Save to Parquet (atomic, read by the surebet loaders from pickle_data)
+            write_parquet_atomic(df, PARQUET_PATH)
+            logger.info(f"Data saved to {PARQUET_PATH}")
+        except Exception as e:
+            logger.error(f"Error saving data: {e}")
+    else:
+        logger.info("No matches were scraped.")
+
+def scrape(driver, url):
+    """
+    Opens url, selects all football matches and reads the match table.
+    Returns the raw rows (see scrape_matches); empty if the page could not be prepared.
+    """
     # Navigate to the target URL
     try:
         driver.get(url)
-        logging.info(f"Navigated to {url}")
-        close_overlays(driver)  # Close any pop-ups or overlays
-        # Wait until the left menu is present
+        logger.info(f"Navigated to {url}")
+        # get() returns at DOMContentLoaded (eager pool drivers); wait until the left menu is present
         WebDriverWait(driver, 15).until(
             EC.presence_of_element_located((By.ID, "left-menu"))
         )
-        logging.info("Page loaded and left menu is present.")
+        logger.info("Page loaded and left menu is present.")
+        close_overlays(driver)  # Close any pop-ups or overlays
     except Exception as e:
-        logging.error(f"Error navigating to {url}: {e}")
-        driver.quit()
-        return
+        logger.error(f"Error navigating to {url}: {e}")
+        return []
 
     all_matches = []
 
     # 1) Locate the "NOGOMET" (Football) section in the left menu
     try:
         left_menu = driver.find_element(By.ID, "left-menu")
-        logging.info("Located the left menu.")
+        logger.info("Located the left menu.")
     except NoSuchElementException:
-        logging.error("Left menu not found. Exiting.")
-        driver.quit()
-        return
+        logger.error("Left menu not found. Exiting.")
+        return []
 
     # List all 'NOGOMET' elements to ensure targeting the correct one
     click_ostalo(driver)
     nogomet_elements = list_all_nogomet_elements(left_menu)
     if not nogomet_elements:
-        logging.error("No 'NOGOMET' menu items found. Exiting.")
-        driver.quit()
-        return
+        logger.error("No 'NOGOMET' menu items found. Exiting.")
+        return []
 
     # Handle multiple 'NOGOMET' menu items if present
     for index, nogomet_menu in enumerate(nogomet_elements):
-        logging.info(f"Attempting to click on 'NOGOMET' menu item {index + 1}.")
+        logger.info(f"Attempting to click on 'NOGOMET' menu item {index + 1}.")
         # Adjust the left_percentage as needed to ensure accurate clicking
         if click_on_left_side_percentage(driver, nogomet_menu, label=f"NOGOMET Menu {index + 1}", left_percentage=0.48):
-            logging.info(f"Clicked on 'NOGOMET' menu item {index + 1} successfully.")
+            logger.info(f"Clicked on 'NOGOMET' menu item {index + 1} successfully.")
             break
         else:
-            logging.warning(f"Failed to click on 'NOGOMET' menu item {index + 1}.")
+            logger.warning(f"Failed to click on 'NOGOMET' menu item {index + 1}.")
     else:
-        logging.error("Failed to click on any 'NOGOMET' menu items. Exiting.")
-        driver.quit()
-        return
-
-    logging.info("Clicked on 'NOGOMET' menu to load matches.")
+        logger.error("Failed to click on any 'NOGOMET' menu items. Exiting.")
+        return []
 
-    time.sleep(0.5)  # Adjust sleep time as necessary
+    logger.info("Clicked on 'NOGOMET' menu to load matches.")
 
     # 4) Click on each submenu under 'NOGOMET' to load matches
     try:
-        # Locate the expanded submenu under 'NOGOMET'
-        submenu_container = left_menu.find_element(
-            By.XPATH, ".//a[contains(@class, 'has-arrow') and contains(@class, 'soccer') and span[normalize-space(text())='NOGOMET']]/following-sibling::ul"
+        # Locate the expanded submenu under 'NOGOMET', waiting for it to open
+        submenu_container = WebDriverWait(driver, 5).until(
+            lambda d: left_menu.find_element(
+                By.XPATH, ".//a[contains(@class, 'has-arrow') and contains(@class, 'soccer') and span[normalize-space(text())='NOGOMET']]/following-sibling::ul"
+            )
         )
         submenu_items = submenu_container.find_elements(By.XPATH, ".//li/a/span")
-        logging.info(f"Found {len(submenu_items)} submenu items under 'NOGOMET'.")
+        logger.info(f"Found {len(submenu_items)} submenu items under 'NOGOMET'.")
         
         for i, submenu in enumerate(submenu_items, start=0):
             try:
@@ -416,25 +453,24 @@ def run():
                     click_svi_dani(driver)
                     break
                 # Click on each submenu to load its matches
+                old_rows = driver.find_elements(By.CSS_SELECTOR, TABLE_ROW_CSS)
                 safe_click(driver, submenu, label=f"Submenu {submenu.text}")
-                logging.info(f"Clicked on Submenu {submenu.text} successfully.")
-                time.sleep(1)  # Wait for matches to load
+                logger.info(f"Clicked on Submenu {submenu.text} successfully.")
+                wait_for_table_update(driver, old_rows, timeout=2)  # Wait for matches to load
                 # Optionally, you can scrape matches after each submenu click
                 # Uncomment the following lines if you prefer to scrape incrementally
                 # matches = scrape_matches(driver)
-                # logging.info(f"Scraped {len(matches)} matches from Submenu {i}.")
+                # logger.info(f"Scraped {len(matches)} matches from Submenu {i}.")
                 # all_matches.extend(matches)
             except Exception as e:
-                logging.error(f"Error clicking on Submenu {submenu.text}: {e}")
+                logger.error(f"Error clicking on Submenu {submenu.text}: {e}")
                 continue
-    except NoSuchElementException:
-        logging.error("Submenu container under 'NOGOMET' not found. Exiting.")
-        driver.quit()
-        return
+    except (NoSuchElementException, TimeoutException):
+        logger.error("Submenu container under 'NOGOMET' not found. Exiting.")
+        return []
     except Exception as e:
-        logging.error(f"Error locating submenu items: {e}")
-        driver.quit()
-        return
+        logger.error(f"Error locating submenu items: {e}")
+        return []
 
     scroll_attempts = 0
     max_scroll_attempts = 1
@@ -450,9 +486,9 @@ def run():
         # 7) Scrape the matches from the loaded page
         if new_height == last_height:
             scroll_attempts += 1
-            logging.info(f"No new content. scroll_attempts={scroll_attempts}/{max_scroll_attempts}")
+            logger.info(f"No new content. scroll_attempts={scroll_attempts}/{max_scroll_attempts}")
             if scroll_attempts >= max_scroll_attempts:
-                logging.info("Max scroll attempts reached. Stopping scroll.")
+                logger.info("Max scroll attempts reached. Stopping scroll.")
                 break
         else:
             last_height = new_height
@@ -460,40 +496,20 @@ def run():
       # Adjust sleep time as necessary
     try:
         matches = scrape_matches(driver)
-        logging.info(f"Scraped {len(matches)} matches.")
+        logger.info(f"Scraped {len(matches)} matches.")
         all_matches.extend(matches)
     except Exception as e:
-        logging.error(f"Error during match scraping: {e}")
+        logger.error(f"Error during match scraping: {e}")
 
-    # 8) Close the WebDriver
-    try:
-        driver.quit()
-        logging.info("WebDriver closed successfully.")
-    except Exception as e:
-        logging.error(f"Error closing WebDriver: {e}")
+    return all_matches
 
-    # 9) Save the scraped data
-    if all_matches:
-        try:
-            df = pd.DataFrame(all_matches)
-            logging.info(f"DataFrame created with {len(df)} rows.")
-
-            # Save to Excel
-            os.makedirs("data", exist_ok=True)
-            excel_path = "data/takmicenjesportplus.xlsx"
-            df.to_excel(excel_path, index=False)
-            logging.info(f"Data saved to {excel_path}")
-
-            # Save to Pickle
-            os.makedirs("pickle_data", exist_ok=True)
-            pickle_path = "pickle_data/takmicenjesportplusbin.pkl"
-            with open(pickle_path, "wb") as f:
-                pickle.dump(df, f)
-            logging.info(f"Data pickled to {pickle_path}")
-        except Exception as e:
-            logging.error(f"Error saving data: {e}")
-    else:
-        logging.info("No matches were scraped.")
+async def run_async():
+    """
+    Runs the blocking Selenium scrape in the default executor, so it can be
+    awaited alongside other scrapers on one event loop.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, run)
 
 if __name__ == "__main__":
     run()
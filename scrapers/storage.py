@@ -0,0 +1,58 @@
+import os
+import time
+import hashlib
+
+
+def write_parquet_atomic(df, path):
+    """
+    Writes df to path as zstd Parquet through a temporary file and os.replace,
+    so a reader never sees a half-written file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    try:
+        df.to_parquet(tmp_path, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def page_hash(html):
+    """
+    Returns a short blake2b digest of a page's HTML.
+    """
+    return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def is_unchanged(hash_path, digest, output_path):
+    """
+    True if digest matches the one stored at hash_path and the output it
+    produced is still there (the surebet step archives outputs away).
+    """
+    if not os.path.exists(output_path):
+        return False
+    try:
+        with open(hash_path) as f:
+            return f.read().strip() == digest
+    except OSError:
+        return False
+
+
+def store_hash(hash_path, digest):
+    """
+    Remembers digest for the next is_unchanged() check; call it only after the output was written.
+    """
+    os.makedirs(os.path.dirname(hash_path) or ".", exist_ok=True)
+    with open(hash_path, "w") as f:
+        f.write(digest)
+
+
+def is_fresh(path, ttl_seconds):
+    """
+    True if path exists and was written less than ttl_seconds ago.
+    """
+    try:
+        return time.time() - os.path.getmtime(path) < ttl_seconds
+    except OSError:
+        return False
@@ -2,7 +2,7 @@ import argparse
 import glob
 import os
 import shutil
-import pickle
+import joblib
 import pandas as pd
 
 # RAPIDFUZZ (faster alternative to fuzzywuzzy)
@@ -53,12 +53,15 @@ REQUIRED_COLUMNS = ['home', '1', 'x', '2', 'time']
 #         Concurrency-Enhanced File Loading           #
 # ---------------------------------------------------- #
 def load_pickle_file(file_path: str) -> Tuple[str, pd.DataFrame]:
-    """Load a single .pkl file and return (bookie_name, DataFrame)."""
+    """Load a single .pkl or .parquet file and return (bookie_name, DataFrame)."""
     file_name = os.path.basename(file_path)
     bookie_name = os.path.splitext(file_name)[0]
     try:
-        with open(file_path, "rb") as f:
-            df = pickle.load(f)
+        if file_path.endswith(".parquet"):
+            df = pd.read_parquet(file_path)
+        else:
+            # joblib.load reads both plain pickles and compressed joblib dumps
+            df = joblib.load(file_path)
         logging.info(f"Loaded pickle file: {file_name}")
         return bookie_name, df
     except Exception as e:
@@ -78,9 +81,9 @@ def load_excel_file(file_path: str) -> Tuple[str, pd.DataFrame]:
         return bookie_name, pd.DataFrame()
 
 def load_pickle_data_concurrent(folder_path: str) -> Dict[str, pd.DataFrame]:
-    """Load all .pkl files in concurrent threads and return {bookie_name: df}."""
+    """Load all .pkl/.parquet files in concurrent threads and return {bookie_name: df}."""
     bookies = {}
-    pkl_files = glob.glob(os.path.join(folder_path, "*.pkl"))
+    pkl_files = glob.glob(os.path.join(folder_path, "*.pkl")) + glob.glob(os.path.join(folder_path, "*.parquet"))
 
     if not pkl_files:
         logging.warning(f"No .pkl files found in {folder_path}")
@@ -540,8 +543,8 @@ def main():
         logging.info("No sure bets found after calculations.")
 
     # 6) Archive processed files
-    # Archive .pkl
-    for file_path in glob.glob(os.path.join(PICKLE_FOLDER_PATH, "*.pkl")):
+    # Archive .pkl/.parquet
+    for file_path in glob.glob(os.path.join(PICKLE_FOLDER_PATH, "*.pkl")) + glob.glob(os.path.join(PICKLE_FOLDER_PATH, "*.parquet")):
         archive_file(file_path, ARCHIVE_FOLDER)
 
     # Archive .xlsx
@@ -2,7 +2,7 @@ import argparse
 import glob
 import os
 import shutil
-import pickle
+import joblib
 import pandas as pd
 import openpyxl
 import logging
@@ -133,12 +133,15 @@ def convert_time_to_utc(df: pd.DataFrame, bookie_name: str, time_col: str = 'tim
 # ------------------------------------- #
 def load_pickle_data(folder_path: str) -> dict:
     bookies = {}
-    for file_path in glob.glob(os.path.join(folder_path, "*.pkl")):
+    for file_path in glob.glob(os.path.join(folder_path, "*.pkl")) + glob.glob(os.path.join(folder_path, "*.parquet")):
         file_name = os.path.basename(file_path)
         bookie_name = os.path.splitext(file_name)[0]
         try:
-            with open(file_path, "rb") as f:
-                df = pickle.load(f)
+            if file_path.endswith(".parquet"):
+                df = pd.read_parquet(file_path)
+            else:
+                # joblib.load reads both plain pickles and compressed joblib dumps
+                df = joblib.load(file_path)
             logging.info(f"Loaded pickle file: {file_name}")
             bookies[bookie_name] = df
         except Exception as e:
@@ -572,7 +575,8 @@ def main():
     else:
         logging.info("No sure bets found after implied probability calculation.")
 
-    pkl_paths = glob.glob(os.path.join(config["PICKLE_FOLDER_PATH"], "*.pkl"))
+    pkl_paths = (glob.glob(os.path.join(config["PICKLE_FOLDER_PATH"], "*.pkl"))
+                 + glob.glob(os.path.join(config["PICKLE_FOLDER_PATH"], "*.parquet")))
     logging.info(f"Found {len(pkl_paths)} pickle files to archive.")
     for pkl in pkl_paths:
         archive_file(pkl, config["ARCHIVE_FOLDER"])